@@ -105,6 +105,9 @@ class User(AbstractUser):
     updated_at = models.DateTimeField(auto_now=True)
     last_login_ip = models.GenericIPAddressField(null=True, blank=True)
     
+    # Denormalized badge counter, maintained by messaging.services
+    unread_notifications = models.PositiveIntegerField(default=0, editable=False)
+    
     objects = UserManager()
     
     USERNAME_FIELD = 'email'
@@ -177,7 +177,23 @@ class UserPublicSerializer(serializers.ModelSerializer):
         return None
 
 
-class UserProfileUpdateSerializer(serializers.ModelSerializer):
+class UserSettingsUpdateMixin:
+    """
+    Save only the submitted fields on update.
+
+    A full save would write back columns maintained with F() updates, such
+    as ``unread_notifications``, from the possibly stale request.user.
+    """
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        if validated_data:
+            instance.save(update_fields=[*validated_data, "updated_at"])
+        return instance
+
+
+class UserProfileUpdateSerializer(UserSettingsUpdateMixin, serializers.ModelSerializer):
     """Serializer for updating user profile."""
 
     class Meta:
@@ -333,7 +349,7 @@ class ChangePasswordSerializer(serializers.Serializer):
         return attrs
 
 
-class UserPrivacySettingsSerializer(serializers.ModelSerializer):
+class UserPrivacySettingsSerializer(UserSettingsUpdateMixin, serializers.ModelSerializer):
     """Serializer specifically for privacy settings."""
 
     class Meta:
@@ -341,7 +357,7 @@ class UserPrivacySettingsSerializer(serializers.ModelSerializer):
         fields = ("show_email", "show_phone")
 
 
-class UserNotificationSettingsSerializer(serializers.ModelSerializer):
+class UserNotificationSettingsSerializer(UserSettingsUpdateMixin, serializers.ModelSerializer):
     """Serializer specifically for notification settings."""
 
     class Meta:
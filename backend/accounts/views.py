@@ -519,7 +519,7 @@ class ChangePasswordView(generics.UpdateAPIView):
         
         # Set new password
         user.set_password(serializer.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password'])
         
         # Determine the message based on whether this was first-time password set
         if user.google_id and not user.has_usable_password():
@@ -3,7 +3,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Banner, AdminSettings, BannerClick, BannerImpression
+from .models import Banner, AdminSettings, BannerClick, BannerImpression, DailyStats
 
 # ============================================================================
 # BANNER ADMIN
@@ -203,6 +203,20 @@ class BannerImpressionAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         return False
 
+@admin.register(DailyStats)
+class DailyStatsAdmin(admin.ModelAdmin):
+    """Admin interface for the DailyStats rollup (filled by rollup_daily_stats)."""
+    
+    list_display = ['date', 'state', 'category', 'new_ads', 'views', 'contacts', 'favorites', 'new_users']
+    list_filter = ['state', 'category']
+    date_hierarchy = 'date'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
 # ============================================================================
 # CUSTOM ADMIN ACTIONS
 # ============================================================================
@@ -256,7 +256,7 @@ def admin_change_password(request):
     
     # Set new password
     request.user.set_password(new_password)
-    request.user.save()
+    request.user.save(update_fields=['password'])
     
     logger.info(f"Admin password changed: {request.user.email}")
     
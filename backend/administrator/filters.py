@@ -3,7 +3,7 @@ import django_filters
 from ads.models import Ad, AdReport
 from accounts.models import User
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from ads.filters import BaseAdFilter
 
 
@@ -171,6 +171,12 @@ class AdminUserFilter(django_filters.FilterSet):
     
     has_ads = django_filters.BooleanFilter(method='filter_has_ads')
     
+    # Minimum ad counts (annotated by AdminUserViewSet)
+    min_total_ads = django_filters.NumberFilter(field_name='total_ads', lookup_expr='gte')
+    min_active_ads = django_filters.NumberFilter(field_name='active_ads', lookup_expr='gte')
+    min_pending_ads = django_filters.NumberFilter(field_name='pending_ads', lookup_expr='gte')
+    min_featured_ads = django_filters.NumberFilter(field_name='featured_ads', lookup_expr='gte')
+    
     class Meta:
         model = User
         fields = ['status', 'email_verified', 'is_staff']
@@ -189,9 +195,9 @@ class AdminUserFilter(django_filters.FilterSet):
     
     def filter_has_ads(self, queryset, name, value):
         """Filter users who have ads."""
-        if value:
-            return queryset.filter(ads__isnull=False).distinct()
-        return queryset.filter(ads__isnull=True)
+        # Exists() rather than a join, which would inflate the annotated counts
+        has_ads = Exists(Ad.objects.filter(user=OuterRef('pk')))
+        return queryset.filter(has_ads if value else ~has_ads)
 
 
 class AdminReportFilter(django_filters.FilterSet):
@@ -0,0 +1,61 @@
+# administrator/management/commands/rollup_daily_stats.py
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from administrator.services import DailyStatsService
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the DailyStats rollup from the last processed day up to today. '
+        'Run it periodically (e.g. every 15 minutes) to keep today current.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=date.fromisoformat,
+            help='Recompute from this day (YYYY-MM-DD) instead of the watermark',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute everything from the first recorded activity',
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+
+        if options['since']:
+            start_date = options['since']
+        elif options['full'] or DailyStatsService.get_watermark() is None:
+            start_date = self.first_activity_date() or today
+        else:
+            # The watermark day may have been rolled up before it ended
+            start_date = DailyStatsService.get_watermark()
+
+        if start_date > today:
+            raise CommandError('Start date is in the future')
+
+        total = 0
+        # Roll up a month at a time to keep each grouped query small
+        while start_date <= today:
+            end_date = min(start_date + timedelta(days=30), today)
+            total += DailyStatsService.rollup(start_date, end_date)
+            start_date = end_date + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {total} daily stats rows'))
+
+    @staticmethod
+    def first_activity_date():
+        """Get the day of the oldest ad or user."""
+        from ads.models import Ad
+        from accounts.models import User
+
+        candidates = [
+            Ad.objects.aggregate(first=Min('created_at'))['first'],
+            User.objects.aggregate(first=Min('created_at'))['first'],
+        ]
+        candidates = [timezone.localtime(value).date() for value in candidates if value]
+        return min(candidates) if candidates else None
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administrator', '0003_adminsettings_allow_registration_and_more'),
+        ('content', '0002_city_photo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('new_ads', models.PositiveIntegerField(default=0, verbose_name='New Ads')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Views')),
+                ('contacts', models.PositiveIntegerField(default=0, verbose_name='Contacts')),
+                ('favorites', models.PositiveIntegerField(default=0, verbose_name='Favorites')),
+                ('new_users', models.PositiveIntegerField(default=0, verbose_name='New Users')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='content.category')),
+                ('state', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='content.state')),
+            ],
+            options={
+                'verbose_name': 'Daily Stats',
+                'verbose_name_plural': 'Daily Stats',
+                'indexes': [models.Index(fields=['date'], name='administrat_date_f58002_idx'), models.Index(fields=['state', 'date'], name='administrat_state_i_ca53fc_idx')],
+                'unique_together': {('date', 'state', 'category')},
+            },
+        ),
+    ]
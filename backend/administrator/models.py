@@ -323,3 +323,47 @@ class AdminSettings(models.Model):
         )
         return settings
 
+
+class DailyStats(models.Model):
+    """
+    Daily activity rollup per state and category.
+    
+    Filled incrementally by the ``rollup_daily_stats`` command so analytics
+    endpoints and exports don't group raw view/contact rows per request.
+    User registrations have no state or category and are stored on the
+    (date, NULL, NULL) row.
+    """
+    
+    date = models.DateField(_('Date'))
+    state = models.ForeignKey(
+        State,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='daily_stats'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='daily_stats'
+    )
+    
+    new_ads = models.PositiveIntegerField(_('New Ads'), default=0)
+    views = models.PositiveIntegerField(_('Views'), default=0)
+    contacts = models.PositiveIntegerField(_('Contacts'), default=0)
+    favorites = models.PositiveIntegerField(_('Favorites'), default=0)
+    new_users = models.PositiveIntegerField(_('New Users'), default=0)
+    
+    class Meta:
+        verbose_name = _('Daily Stats')
+        verbose_name_plural = _('Daily Stats')
+        unique_together = ['date', 'state', 'category']
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['state', 'date']),
+        ]
+    
+    def __str__(self):
+        return f'Stats for {self.date} ({self.state or "all states"})'
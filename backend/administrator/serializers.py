@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from ads.models import Ad, AdReport
 from content.models import Category, State, City
 from .models import Banner, AdminSettings
+from .services import ContentStatsService
 from ads.serializers import AdImageSerializer
 
 User = get_user_model()
@@ -148,15 +149,24 @@ class AdminUserSerializer(serializers.ModelSerializer):
         read_only_fields = ["created_at", "last_login"]
 
     def get_total_ads(self, obj):
+        # AdminUserViewSet annotates the counts; fall back to counting otherwise
+        if hasattr(obj, "total_ads"):
+            return obj.total_ads
         return obj.ads.exclude(status="deleted").count()
 
     def get_active_ads(self, obj):
+        if hasattr(obj, "active_ads"):
+            return obj.active_ads
         return obj.ads.filter(status="approved").count()
 
     def get_pending_ads(self, obj):
+        if hasattr(obj, "pending_ads"):
+            return obj.pending_ads
         return obj.ads.filter(status="pending").count()
 
     def get_featured_ads(self, obj):
+        if hasattr(obj, "featured_ads"):
+            return obj.featured_ads
         return obj.ads.filter(plan="featured").count()
 
     def get_days_since_joined(self, obj):
@@ -375,9 +385,36 @@ class AdminBannerSerializer(serializers.ModelSerializer):
 # ============================================================================
 
 
-class AdminStateSerializer(serializers.ModelSerializer):
+class AdStatsMixin:
+    """
+    Serve the ad count fields from ContentStatsService.
+
+    These serializers render one object at a time (create, update, detail),
+    so all count fields share one grouped query instead of a count each.
+    The list views read ``ContentStatsService.ad_stats`` for every row
+    themselves.
+    """
+
+    ad_stats_group_by = None  # Ad field the stats are grouped by
+
+    def get_ad_stats(self, obj):
+        stats = self.__dict__.setdefault("_ad_stats", {})
+        if obj.pk not in stats:
+            stats.update(
+                ContentStatsService.ad_stats(
+                    self.ad_stats_group_by,
+                    Ad.objects.filter(**{self.ad_stats_group_by: obj}),
+                )
+            )
+            stats.setdefault(obj.pk, ContentStatsService.EMPTY)
+        return ContentStatsService.get(stats, obj.pk)
+
+
+class AdminStateSerializer(AdStatsMixin, serializers.ModelSerializer):
     """Serializer for admin state management."""
 
+    ad_stats_group_by = "state"
+
     total_ads = serializers.SerializerMethodField(read_only=True)
     active_ads = serializers.SerializerMethodField(read_only=True)
     users_count = serializers.SerializerMethodField(read_only=True)
@@ -446,18 +483,20 @@ class AdminStateSerializer(serializers.ModelSerializer):
         return value
 
     def get_total_ads(self, obj):
-        return obj.ads.exclude(status="deleted").count()
+        return self.get_ad_stats(obj)["total_ads"]
 
     def get_active_ads(self, obj):
-        return obj.ads.filter(status="approved").count()
+        return self.get_ad_stats(obj)["active_ads"]
 
     def get_users_count(self, obj):
-        return obj.ads.values("user").distinct().count()
+        return self.get_ad_stats(obj)["users_count"]
 
 
-class AdminCategorySerializer(serializers.ModelSerializer):
+class AdminCategorySerializer(AdStatsMixin, serializers.ModelSerializer):
     """Serializer for admin category management."""
 
+    ad_stats_group_by = "category"
+
     total_ads = serializers.SerializerMethodField()
     active_ads = serializers.SerializerMethodField()
     pending_ads = serializers.SerializerMethodField()
@@ -478,18 +517,20 @@ class AdminCategorySerializer(serializers.ModelSerializer):
         ]
 
     def get_total_ads(self, obj):
-        return obj.ads.exclude(status="deleted").count()
+        return self.get_ad_stats(obj)["total_ads"]
 
     def get_active_ads(self, obj):
-        return obj.ads.filter(status="approved").count()
+        return self.get_ad_stats(obj)["active_ads"]
 
     def get_pending_ads(self, obj):
-        return obj.ads.filter(status="pending").count()
+        return self.get_ad_stats(obj)["pending_ads"]
 
 
-class AdminCitySerializer(serializers.ModelSerializer):
+class AdminCitySerializer(AdStatsMixin, serializers.ModelSerializer):
     """Serializer for admin city management."""
 
+    ad_stats_group_by = "city"
+
     state_name = serializers.CharField(source="state.name", read_only=True)
     total_ads = serializers.SerializerMethodField()
 
@@ -506,7 +547,7 @@ class AdminCitySerializer(serializers.ModelSerializer):
         ]
 
     def get_total_ads(self, obj):
-        return obj.ads.exclude(status="deleted").count()
+        return self.get_ad_stats(obj)["total_ads"]
 
 
 # ============================================================================
@@ -0,0 +1,465 @@
+# administrator/services.py
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from ads.models import Ad, AdReport
+from accounts.models import User
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardStatsService:
+    """
+    Aggregates for the admin dashboard overview.
+
+    Each table is read once with conditional aggregation. Engagement totals
+    come from the denormalized per-ad counters (kept in sync by
+    ads.counters) instead of counting AdView/AdContact/AdFavorite rows.
+    Results are cached per state filter for ``CACHE_TIMEOUT`` seconds.
+    """
+
+    CACHE_TIMEOUT = 60  # seconds
+
+    @staticmethod
+    def cache_key(state_filter):
+        return f"admin_dashboard_stats:{(state_filter or 'all').upper()}"
+
+    @classmethod
+    def get_stats(cls, state_filter="all"):
+        """Get dashboard stats for one state code or "all", cached."""
+        cache_key = cls.cache_key(state_filter)
+        stats = cache.get(cache_key)
+
+        if stats is None:
+            stats = cls.compute_stats(state_filter)
+            cache.set(cache_key, stats, cls.CACHE_TIMEOUT)
+
+        return stats
+
+    @staticmethod
+    def compute_stats(state_filter="all"):
+        """Compute dashboard stats without the cache (three queries)."""
+        week_ago = timezone.now() - timedelta(days=7)
+
+        ads_qs = Ad.objects.exclude(status="deleted")
+        reports_qs = AdReport.objects.filter(is_reviewed=False).exclude(
+            ad__status="deleted"
+        )
+        if state_filter and state_filter != "all":
+            ads_qs = ads_qs.filter(state__code__iexact=state_filter)
+            reports_qs = reports_qs.filter(ad__state__code__iexact=state_filter)
+
+        ads = ads_qs.aggregate(
+            total=Count("id"),
+            active=Count("id", filter=Q(status="approved")),
+            pending=Count("id", filter=Q(status="pending")),
+            rejected=Count("id", filter=Q(status="rejected")),
+            featured=Count("id", filter=Q(plan="featured")),
+            new_this_week=Count("id", filter=Q(created_at__gte=week_ago)),
+            total_views=Sum("view_count"),
+            total_contacts=Sum("contact_count"),
+            total_favorites=Sum("favorite_count"),
+        )
+
+        users = User.objects.aggregate(
+            total=Count("id"),
+            active=Count("id", filter=Q(is_active=True, is_suspended=False)),
+            suspended=Count("id", filter=Q(is_suspended=True)),
+            banned=Count("id", filter=Q(is_active=False)),
+            new_this_week=Count("id", filter=Q(created_at__gte=week_ago)),
+        )
+
+        return {
+            "ads": {
+                "total": ads["total"],
+                "active": ads["active"],
+                "pending": ads["pending"],
+                "rejected": ads["rejected"],
+                "featured": ads["featured"],
+                "new_this_week": ads["new_this_week"],
+            },
+            "users": users,
+            "engagement": {
+                "total_views": ads["total_views"] or 0,
+                "total_contacts": ads["total_contacts"] or 0,
+                "total_favorites": ads["total_favorites"] or 0,
+            },
+            "moderation": {
+                "pending_reports": reports_qs.count(),
+            },
+        }
+
+
+class DailyStatsService:
+    """Builds and reads the DailyStats rollup table."""
+
+    # Source querysets: (DailyStats field, model, timestamp field, ad lookup prefix)
+    SOURCES = (
+        ("new_ads", "ads.Ad", "created_at", ""),
+        ("views", "ads.AdView", "viewed_at", "ad__"),
+        ("contacts", "ads.AdContact", "viewed_at", "ad__"),
+        ("favorites", "ads.AdFavorite", "created_at", "ad__"),
+    )
+
+    @staticmethod
+    def get_watermark():
+        """Get the last rolled-up day, or None if nothing was processed yet."""
+        from .models import DailyStats
+
+        return DailyStats.objects.aggregate(last=Max("date"))["last"]
+
+    @classmethod
+    def rollup(cls, start_date, end_date=None):
+        """
+        Recompute DailyStats for every day from ``start_date`` to ``end_date``
+        (today by default), inclusive. Returns the number of rows written.
+
+        One grouped query per source table covers the whole range.
+        """
+        from django.apps import apps
+        from .models import DailyStats
+
+        end_date = end_date or timezone.localdate()
+        start = timezone.make_aware(datetime.combine(start_date, time.min))
+        end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+
+        rows = defaultdict(lambda: defaultdict(int))
+
+        for field, model_label, timestamp, prefix in cls.SOURCES:
+            queryset = apps.get_model(model_label).objects.filter(
+                **{f"{timestamp}__gte": start, f"{timestamp}__lt": end}
+            )
+            if field == "new_ads":
+                queryset = queryset.exclude(status="deleted")
+
+            grouped = (
+                queryset.annotate(date=TruncDate(timestamp))
+                .values_list("date", f"{prefix}state_id", f"{prefix}category_id")
+                .annotate(total=Count("id"))
+                .order_by()
+            )
+            for date, state_id, category_id, total in grouped:
+                rows[(date, state_id, category_id)][field] += total
+
+        registrations = (
+            User.objects.filter(created_at__gte=start, created_at__lt=end)
+            .annotate(date=TruncDate("created_at"))
+            .values_list("date")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        for date, total in registrations:
+            rows[(date, None, None)]["new_users"] += total
+
+        with transaction.atomic():
+            DailyStats.objects.filter(date__gte=start_date, date__lte=end_date).delete()
+            DailyStats.objects.bulk_create(
+                [
+                    DailyStats(date=date, state_id=state_id, category_id=category_id, **counts)
+                    for (date, state_id, category_id), counts in rows.items()
+                ],
+                batch_size=1000,
+            )
+
+        return len(rows)
+
+    @staticmethod
+    def daily_totals(start_date, end_date=None, state_filter="all"):
+        """
+        Get {date: {new_ads, views, contacts, favorites, new_users}} for a range.
+
+        ``new_users`` is site-wide; it is not narrowed by ``state_filter``.
+        """
+        from .models import DailyStats
+
+        queryset = DailyStats.objects.filter(date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(date__lte=end_date)
+        if state_filter and state_filter != "all":
+            queryset = queryset.filter(
+                Q(state__code__iexact=state_filter) | Q(state__isnull=True)
+            )
+
+        totals = (
+            queryset.values("date")
+            .annotate(
+                new_ads=Sum("new_ads"),
+                views=Sum("views"),
+                contacts=Sum("contacts"),
+                favorites=Sum("favorites"),
+                new_users=Sum("new_users"),
+            )
+            .order_by("date")
+        )
+        return {row.pop("date"): row for row in totals}
+
+
+class ContentStatsService:
+    """
+    Ad statistics for the admin states, categories and cities tabs.
+
+    One grouped query per entity type, merged into the rows in Python, so
+    the tabs cost the same number of queries however many entities exist.
+    """
+
+    EMPTY = {"total_ads": 0, "active_ads": 0, "pending_ads": 0, "users_count": 0}
+
+    @classmethod
+    def ad_stats(cls, group_by, ads=None):
+        """
+        Get ``{<group_by id>: stats}`` for ``ads`` (default: every ad).
+
+        ``total_ads`` leaves out deleted ads; ``users_count`` counts the
+        distinct posters of any ad. Use ``get`` to read missing ids as zeros.
+        """
+        ads = Ad.objects.all() if ads is None else ads
+        rows = (
+            ads.order_by()
+            .values(group_by)
+            .annotate(
+                total_ads=Count("id", filter=~Q(status="deleted")),
+                active_ads=Count("id", filter=Q(status="approved")),
+                pending_ads=Count("id", filter=Q(status="pending")),
+                users_count=Count("user", distinct=True),
+            )
+        )
+        return {row.pop(group_by): row for row in rows}
+
+    @classmethod
+    def get(cls, stats, object_id):
+        """Read one entity's stats, zeros if it has no ads."""
+        return stats.get(object_id, cls.EMPTY)
+
+
+class BulkModerationService:
+    """
+    Set-based moderation actions for ads, users and reports.
+
+    Each action is applied with ``QuerySet.update()`` inside one
+    transaction. Listing cache invalidation and owner notifications run
+    once for the whole batch after commit. Every method returns
+    ``{"updated_count": n, "results": [{"id": ..., "result": ...}]}`` where
+    result is "updated", "unchanged" or "not_found".
+    """
+
+    AD_ACTIONS = ("approve", "reject", "delete", "feature", "unfeature")
+    USER_ACTIONS = ("ban", "suspend", "activate")
+    REPORT_ACTIONS = ("approve", "dismiss")
+
+    @staticmethod
+    def _results(requested_ids, found_ids, updated_ids):
+        results = []
+        for object_id in requested_ids:
+            if object_id in updated_ids:
+                result = "updated"
+            elif object_id in found_ids:
+                result = "unchanged"
+            else:
+                result = "not_found"
+            results.append({"id": object_id, "result": result})
+        return {"updated_count": len(updated_ids), "results": results}
+
+    @staticmethod
+    def _clean_ids(ids):
+        """Coerce ids to unique ints, preserving order and dropping junk."""
+        cleaned = []
+        for value in ids:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                continue
+            if value not in cleaned:
+                cleaned.append(value)
+        return cleaned
+
+    # ========== Ads ==========
+
+    @classmethod
+    def moderate_ads(cls, ad_ids, action, admin, reason="", admin_notes=""):
+        """Approve, reject, delete, feature or unfeature ads in bulk."""
+        from ads.category_counts import CategoryCountService
+        from ads.listing_cache import bump_listing_versions
+
+        if action not in cls.AD_ACTIONS:
+            raise ValueError(f"Unknown ad action: {action}")
+
+        ad_ids = cls._clean_ids(ad_ids)
+        now = timezone.now()
+
+        # Ads already in the target state are left alone
+        updates, already = {
+            "approve": (
+                {"status": "approved", "approved_by": admin, "approved_at": now},
+                Q(status="approved"),
+            ),
+            "reject": (
+                {
+                    "status": "rejected",
+                    "rejection_reason": reason or "Rejected by admin",
+                    "admin_notes": admin_notes,
+                },
+                Q(status="rejected"),
+            ),
+            "delete": (
+                {"status": "deleted", "admin_notes": admin_notes},
+                Q(status="deleted"),
+            ),
+            "feature": (
+                {"plan": "featured", "featured_expires_at": now + timedelta(days=30)},
+                Q(plan="featured", featured_expires_at__gt=now),
+            ),
+            "unfeature": (
+                {"plan": "free", "featured_expires_at": None},
+                Q(plan="free"),
+            ),
+        }[action]
+
+        with transaction.atomic():
+            ads = Ad.objects.select_for_update().filter(id__in=ad_ids)
+            found_ids = set(ads.values_list("id", flat=True))
+
+            targets = ads.exclude(already)
+            # Dedupe in Python: FOR UPDATE cannot be combined with DISTINCT
+            rows = list(targets.values_list("id", "status", "state_id", "category_id"))
+            listings = {(state_id, category_id) for _, _, state_id, category_id in rows}
+            updated_ids = {ad_id for ad_id, _, _, _ in rows}
+
+            if updated_ids:
+                Ad.objects.filter(id__in=updated_ids).update(updated_at=now, **updates)
+                if "status" in updates:
+                    CategoryCountService.status_changed(
+                        [row[1:] for row in rows], updates["status"]
+                    )
+
+            transaction.on_commit(lambda: bump_listing_versions(listings))
+
+            if updated_ids and action in ("approve", "reject"):
+                notification_type = "ad_approved" if action == "approve" else "ad_rejected"
+                transaction.on_commit(
+                    lambda: cls._notify_owners(updated_ids, notification_type)
+                )
+
+        return cls._results(ad_ids, found_ids, updated_ids)
+
+    @staticmethod
+    def _notify_owners(ad_ids, notification_type):
+        """Send the batched approval/rejection notifications."""
+        from messaging.services import NotificationService
+
+        try:
+            ads = Ad.objects.select_related("user").filter(id__in=ad_ids)
+            NotificationService.send_ad_status_notifications(ads, notification_type)
+        except Exception as e:
+            logger.error(f"Failed to send {notification_type} notifications: {str(e)}")
+
+    # ========== Users ==========
+
+    @classmethod
+    def moderate_users(cls, user_ids, action, reason=""):
+        """Ban, suspend or activate users in bulk."""
+        if action not in cls.USER_ACTIONS:
+            raise ValueError(f"Unknown user action: {action}")
+
+        user_ids = cls._clean_ids(user_ids)
+
+        updates, already = {
+            "ban": (
+                {"is_active": False, "is_suspended": True, "suspension_reason": reason},
+                Q(is_active=False, is_suspended=True, suspension_reason=reason),
+            ),
+            "suspend": (
+                {"is_suspended": True, "suspension_reason": reason},
+                Q(is_suspended=True, suspension_reason=reason),
+            ),
+            "activate": (
+                {"is_active": True, "is_suspended": False, "suspension_reason": ""},
+                Q(is_active=True, is_suspended=False, suspension_reason=""),
+            ),
+        }[action]
+
+        with transaction.atomic():
+            users = User.objects.select_for_update().filter(id__in=user_ids)
+            found_ids = set(users.values_list("id", flat=True))
+            updated_ids = set(users.exclude(already).values_list("id", flat=True))
+
+            if updated_ids:
+                User.objects.filter(id__in=updated_ids).update(
+                    updated_at=timezone.now(), **updates
+                )
+
+        return cls._results(user_ids, found_ids, updated_ids)
+
+    # ========== Reports ==========
+
+    @classmethod
+    def moderate_reports(cls, report_ids, action, admin, admin_notes=""):
+        """
+        Approve or dismiss reports in bulk.
+
+        Approving also acts on the reported ads: spam/fraud reports reject
+        the ad, inappropriate-content reports send it back for review.
+        """
+        from ads.category_counts import CategoryCountService
+        from ads.listing_cache import bump_listing_versions
+
+        if action not in cls.REPORT_ACTIONS:
+            raise ValueError(f"Unknown report action: {action}")
+
+        report_ids = cls._clean_ids(report_ids)
+        now = timezone.now()
+        reasons = dict(AdReport.REASON_CHOICES)
+
+        with transaction.atomic():
+            reports = AdReport.objects.select_for_update().filter(id__in=report_ids)
+            found = list(reports.values_list("id", "reason", "ad_id"))
+            found_ids = {report_id for report_id, _, _ in found}
+
+            reports.update(
+                is_reviewed=True,
+                reviewed_by=admin,
+                reviewed_at=now,
+                admin_notes=admin_notes,
+            )
+
+            rejected_ids = set()
+            listings = []
+            if action == "approve":
+                ads_by_reason = defaultdict(set)
+                for _, reason, ad_id in found:
+                    ads_by_reason[reason].add(ad_id)
+
+                for reason, ad_ids in ads_by_reason.items():
+                    if reason in ("spam", "fraud"):
+                        updates = {
+                            "status": "rejected",
+                            "rejection_reason": f"Reported as {reasons.get(reason, reason)}",
+                        }
+                    elif reason == "inappropriate":
+                        updates = {"status": "pending"}
+                    else:
+                        continue
+
+                    ads = Ad.objects.filter(id__in=ad_ids)
+                    rows = list(ads.values_list("id", "status", "state_id", "category_id"))
+                    listings += [(state_id, category_id) for _, _, state_id, category_id in rows]
+                    if updates["status"] == "rejected":
+                        rejected_ids.update(
+                            ad_id for ad_id, status, _, _ in rows if status != "rejected"
+                        )
+                    ads.update(updated_at=now, **updates)
+                    CategoryCountService.status_changed(
+                        [row[1:] for row in rows], updates["status"]
+                    )
+
+            transaction.on_commit(lambda: bump_listing_versions(listings))
+            if rejected_ids:
+                transaction.on_commit(
+                    lambda: cls._notify_owners(rejected_ids, "ad_rejected")
+                )
+
+        return cls._results(report_ids, found_ids, found_ids)
@@ -3,7 +3,7 @@ from rest_framework import generics, status, viewsets, filters, serializers
 from rest_framework.decorators import api_view, permission_classes, action as drf_action
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from django.db.models import Count, Sum, Q, Avg, F
+from django.db.models import Count, Sum, Q, Avg, F, Exists, OuterRef
 from django.db.models.functions import TruncDate, TruncMonth, TruncDay
 from django.utils import timezone
 from datetime import timedelta, datetime
@@ -13,8 +13,9 @@ from django_filters.rest_framework import DjangoFilterBackend
 from core.simple_mixins import AdminViewMixin
 from core.search_mixins import SearchFilterMixin
 from core.pagination import LargeResultsSetPagination, StandardResultsSetPagination
+from core.exports import stream_csv, get_export_filters, filter_by_date
 
-from ads.models import Ad, AdView, AdContact, AdFavorite, AdReport
+from ads.models import Ad, AdImage, AdReport
 from accounts.models import User
 from content.models import Category, State, City
 from .models import Banner, AdminSettings
@@ -28,6 +29,15 @@ from .serializers import (
     AdminBannerSerializer,
 )
 from .filters import AdminUserFilter, AdminReportFilter, AdminAdFilter
+from .services import (
+    DashboardStatsService,
+    DailyStatsService,
+    BulkModerationService,
+    ContentStatsService,
+)
+
+# Rows fetched per database round trip by the streaming CSV exports
+EXPORT_CHUNK_SIZE = 2000
 
 # ============================================================================
 # DASHBOARD STATISTICS
@@ -41,67 +51,7 @@ class AdminDashboardStatsView(generics.GenericAPIView):
 
     def get(self, request):
         state_filter = request.query_params.get("state", "all")
-
-        # Base queryset
-        ads_qs = Ad.objects.exclude(status="deleted")
-        users_qs = User.objects.all()
-
-        # Apply state filter
-        if state_filter != "all":
-            ads_qs = ads_qs.filter(state__code=state_filter)
-
-        # Calculate statistics
-        total_ads = ads_qs.count()
-        active_ads = ads_qs.filter(status="approved").count()
-        pending_ads = ads_qs.filter(status="pending").count()
-        rejected_ads = ads_qs.filter(status="rejected").count()
-        featured_ads = ads_qs.filter(plan="featured").count()
-
-        total_users = users_qs.count()
-        active_users = users_qs.filter(is_active=True, is_suspended=False).count()
-        suspended_users = users_qs.filter(is_suspended=True).count()
-        banned_users = users_qs.filter(is_active=False).count()
-
-        total_views = AdView.objects.filter(ad__in=ads_qs).count()
-        total_contacts = AdContact.objects.filter(ad__in=ads_qs).count()
-        total_favorites = AdFavorite.objects.filter(ad__in=ads_qs).count()
-
-        pending_reports = AdReport.objects.filter(
-            is_reviewed=False, ad__in=ads_qs
-        ).count()
-
-        # Recent activity (last 7 days)
-        week_ago = timezone.now() - timedelta(days=7)
-        new_ads_this_week = ads_qs.filter(created_at__gte=week_ago).count()
-        new_users_this_week = users_qs.filter(created_at__gte=week_ago).count()
-
-        return Response(
-            {
-                "ads": {
-                    "total": total_ads,
-                    "active": active_ads,
-                    "pending": pending_ads,
-                    "rejected": rejected_ads,
-                    "featured": featured_ads,
-                    "new_this_week": new_ads_this_week,
-                },
-                "users": {
-                    "total": total_users,
-                    "active": active_users,
-                    "suspended": suspended_users,
-                    "banned": banned_users,
-                    "new_this_week": new_users_this_week,
-                },
-                "engagement": {
-                    "total_views": total_views,
-                    "total_contacts": total_contacts,
-                    "total_favorites": total_favorites,
-                },
-                "moderation": {
-                    "pending_reports": pending_reports,
-                },
-            }
-        )
+        return Response(DashboardStatsService.get_stats(state_filter))
 
 
 # ============================================================================
@@ -141,7 +91,7 @@ class AdminAdViewSet(AdminViewMixin, SearchFilterMixin, viewsets.ReadOnlyModelVi
         """Get ads queryset with admin filtering."""
         return Ad.objects.select_related(
             "category", "city", "state", "user"
-        ).prefetch_related("images")
+        ).prefetch_related("images", AdImage.prefetch_primary())
 
     @drf_action(detail=True, methods=["post"])
     def action(self, request, pk=None):
@@ -151,37 +101,21 @@ class AdminAdViewSet(AdminViewMixin, SearchFilterMixin, viewsets.ReadOnlyModelVi
         reason = request.data.get("reason", "")
         admin_notes = request.data.get("admin_notes", "")
 
-        if action == "approve":
-            ad.status = "approved"
-            ad.approved_by = request.user
-            ad.approved_at = timezone.now()
-            message = "Ad approved successfully"
-
-        elif action == "reject":
-            ad.status = "rejected"
-            ad.rejection_reason = reason or "Rejected by admin"
-            ad.admin_notes = admin_notes
-            message = "Ad rejected successfully"
-
-        elif action == "delete":
-            ad.status = "deleted"
-            ad.admin_notes = admin_notes
-            message = "Ad deleted successfully"
-
-        elif action == "feature":
-            ad.plan = "featured"
-            ad.featured_expires_at = timezone.now() + timedelta(days=30)
-            message = "Ad featured successfully"
-
-        elif action == "unfeature":
-            ad.plan = "free"
-            ad.featured_expires_at = None
-            message = "Ad unfeatured successfully"
-
-        else:
+        messages = {
+            "approve": "Ad approved successfully",
+            "reject": "Ad rejected successfully",
+            "delete": "Ad deleted successfully",
+            "feature": "Ad featured successfully",
+            "unfeature": "Ad unfeatured successfully",
+        }
+        if action not in messages:
             return Response({"error": "Invalid action"}, status=400)
 
-        ad.save()
+        BulkModerationService.moderate_ads(
+            [ad.id], action, request.user, reason=reason, admin_notes=admin_notes
+        )
+        ad.refresh_from_db()
+        message = messages[action]
 
         return Response({"message": message, "ad": AdminAdSerializer(ad).data})
 
@@ -202,39 +136,17 @@ class AdminAdViewSet(AdminViewMixin, SearchFilterMixin, viewsets.ReadOnlyModelVi
         ]:
             return Response({"error": "Invalid data provided"}, status=400)
 
-        ads = Ad.objects.filter(id__in=ad_ids)
+        result = BulkModerationService.moderate_ads(
+            ad_ids, action, request.user, reason=reason, admin_notes=admin_notes
+        )
 
-        if not ads.exists():
+        if not any(item["result"] != "not_found" for item in result["results"]):
             return Response({"error": "No ads found with provided IDs"}, status=404)
 
-        updated_count = 0
-
-        for ad in ads:
-            if action == "approve":
-                ad.status = "approved"
-                ad.approved_by = request.user
-                ad.approved_at = timezone.now()
-            elif action == "reject":
-                ad.status = "rejected"
-                ad.rejection_reason = reason or "Rejected by admin"
-                ad.admin_notes = admin_notes
-            elif action == "delete":
-                ad.status = "deleted"
-                ad.admin_notes = admin_notes
-            elif action == "feature":
-                ad.plan = "featured"
-                ad.featured_expires_at = timezone.now() + timedelta(days=30)
-            elif action == "unfeature":
-                ad.plan = "free"
-                ad.featured_expires_at = None
-
-            ad.save()
-            updated_count += 1
-
         return Response(
             {
-                "message": f"{updated_count} ads updated successfully",
-                "updated_count": updated_count,
+                "message": f"{result['updated_count']} ads updated successfully",
+                **result,
             }
         )
 
@@ -273,14 +185,29 @@ class AdminUserViewSet(
         "phone",
     ]
 
-    ordering_fields = ["created_at", "email", "first_name", "last_name"]
+    ordering_fields = [
+        "created_at",
+        "email",
+        "first_name",
+        "last_name",
+        "total_ads",
+        "active_ads",
+        "pending_ads",
+        "featured_ads",
+    ]
     ordering = ["-created_at"]
 
     def get_queryset(self):
+        # Ad counts come from one grouped join instead of four queries per user
         return User.objects.filter(
             is_superuser=False,
             is_staff=False
-        ).select_related().prefetch_related("ads")
+        ).annotate(
+            total_ads=Count("ads", filter=~Q(ads__status="deleted")),
+            active_ads=Count("ads", filter=Q(ads__status="approved")),
+            pending_ads=Count("ads", filter=Q(ads__status="pending")),
+            featured_ads=Count("ads", filter=Q(ads__plan="featured")),
+        )
 
     @drf_action(detail=True, methods=["post"])
     def action(self, request, pk=None):
@@ -309,7 +236,7 @@ class AdminUserViewSet(
         else:
             return Response({"error": "Invalid action"}, status=400)
 
-        user.save()
+        user.save(update_fields=["is_active", "is_suspended", "suspension_reason", "updated_at"])
 
         return Response(
             {
@@ -358,33 +285,15 @@ class AdminUserViewSet(
         if not user_ids or action not in ["ban", "suspend", "activate"]:
             return Response({"error": "Invalid data provided"}, status=400)
 
-        users = User.objects.filter(id__in=user_ids)
+        result = BulkModerationService.moderate_users(user_ids, action, reason=reason)
 
-        if not users.exists():
+        if not any(item["result"] != "not_found" for item in result["results"]):
             return Response({"error": "No users found with provided IDs"}, status=404)
 
-        updated_count = 0
-
-        for user in users:
-            if action == "ban":
-                user.is_active = False
-                user.is_suspended = True
-                user.suspension_reason = reason
-            elif action == "suspend":
-                user.is_suspended = True
-                user.suspension_reason = reason
-            elif action == "activate":
-                user.is_active = True
-                user.is_suspended = False
-                user.suspension_reason = ""
-
-            user.save()
-            updated_count += 1
-
         return Response(
             {
-                "message": f"Successfully {action}ed {updated_count} users",
-                "updated_count": updated_count,
+                "message": f"Successfully {action}ed {result['updated_count']} users",
+                **result,
             }
         )
 
@@ -463,35 +372,17 @@ class AdminReportViewSet(AdminViewMixin, viewsets.ReadOnlyModelViewSet):
         if not report_ids or action not in ["approve", "dismiss"]:
             return Response({"error": "Invalid data provided"}, status=400)
 
-        reports = AdReport.objects.filter(id__in=report_ids)
+        result = BulkModerationService.moderate_reports(
+            report_ids, action, request.user, admin_notes=admin_notes
+        )
 
-        if not reports.exists():
+        if not any(item["result"] != "not_found" for item in result["results"]):
             return Response({"error": "No reports found with provided IDs"}, status=404)
 
-        updated_count = 0
-
-        for report in reports:
-            report.is_reviewed = True
-            report.reviewed_by = request.user
-            report.reviewed_at = timezone.now()
-            report.admin_notes = admin_notes
-
-            if action == "approve":
-                ad = report.ad
-                if report.reason in ["spam", "fraud"]:
-                    ad.status = "rejected"
-                    ad.rejection_reason = f"Reported as {report.get_reason_display()}"
-                elif report.reason == "inappropriate":
-                    ad.status = "pending"
-                ad.save()
-
-            report.save()
-            updated_count += 1
-
         return Response(
             {
-                "message": f"{updated_count} reports processed successfully",
-                "updated_count": updated_count,
+                "message": f"{result['updated_count']} reports processed successfully",
+                **result,
             }
         )
 
@@ -516,14 +407,15 @@ def admin_analytics_overview(request):
     if state_filter != "all":
         ads_qs = ads_qs.filter(state__code=state_filter)
 
-    # Daily ad creation trend
-    daily_ads = (
-        ads_qs.filter(created_at__gte=start_date)
-        .annotate(date=TruncDate("created_at"))
-        .values("date")
-        .annotate(count=Count("id"))
-        .order_by("date")
-    )
+    # Daily trends from the DailyStats rollup
+    daily = DailyStatsService.daily_totals(start_date.date(), state_filter=state_filter)
+
+    def trend(field):
+        return [
+            {"date": date, "count": totals[field]}
+            for date, totals in daily.items()
+            if totals[field]
+        ]
 
     # Status distribution
     status_dist = ads_qs.values("status").annotate(count=Count("id"))
@@ -535,30 +427,13 @@ def admin_analytics_overview(request):
         .order_by("-count")[:10]
     )
 
-    # View and contact trends
-    daily_views = (
-        AdView.objects.filter(viewed_at__gte=start_date, ad__in=ads_qs)
-        .annotate(date=TruncDate("viewed_at"))
-        .values("date")
-        .annotate(count=Count("id"))
-        .order_by("date")
-    )
-
-    daily_contacts = (
-        AdContact.objects.filter(contacted_at__gte=start_date, ad__in=ads_qs)
-        .annotate(date=TruncDate("contacted_at"))
-        .values("date")
-        .annotate(count=Count("id"))
-        .order_by("date")
-    )
-
     return Response(
         {
-            "daily_ads": list(daily_ads),
+            "daily_ads": trend("new_ads"),
             "status_distribution": list(status_dist),
             "top_categories": list(category_dist),
-            "daily_views": list(daily_views),
-            "daily_contacts": list(daily_contacts),
+            "daily_views": trend("views"),
+            "daily_contacts": trend("contacts"),
         }
     )
 
@@ -572,21 +447,19 @@ def admin_analytics_users(request):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=days)
 
-    # Daily user registrations
-    daily_users = (
-        User.objects.filter(created_at__gte=start_date)
-        .annotate(date=TruncDate("created_at"))
-        .values("date")
-        .annotate(count=Count("id"))
-        .order_by("date")
-    )
+    # Daily user registrations from the DailyStats rollup
+    daily_users = [
+        {"date": date, "count": totals["new_users"]}
+        for date, totals in DailyStatsService.daily_totals(start_date.date()).items()
+        if totals["new_users"]
+    ]
 
     # User status distribution
-    status_dist = {
-        "active": User.objects.filter(is_active=True, is_suspended=False).count(),
-        "suspended": User.objects.filter(is_suspended=True).count(),
-        "banned": User.objects.filter(is_active=False).count(),
-    }
+    status_dist = User.objects.aggregate(
+        active=Count("id", filter=Q(is_active=True, is_suspended=False)),
+        suspended=Count("id", filter=Q(is_suspended=True)),
+        banned=Count("id", filter=Q(is_active=False)),
+    )
 
     # Top users by ad count
     top_users = User.objects.annotate(
@@ -605,7 +478,7 @@ def admin_analytics_users(request):
 
     return Response(
         {
-            "daily_registrations": list(daily_users),
+            "daily_registrations": daily_users,
             "status_distribution": status_dist,
             "top_users": top_users_data,
         }
@@ -822,15 +695,11 @@ class AdminStateListView(generics.ListCreateAPIView):
     def list(self, request, *args, **kwargs):
         """Custom list response with stats."""
         queryset = self.get_queryset()
+        ad_stats = ContentStatsService.ad_stats("state")
 
         states_data = []
         for state in queryset:
-            # Get stats for this state
-            ads_count = Ad.objects.filter(state=state).exclude(status="deleted").count()
-            active_ads = Ad.objects.filter(state=state, status="approved").count()
-            users_count = (
-                Ad.objects.filter(state=state).values("user").distinct().count()
-            )
+            stats = ContentStatsService.get(ad_stats, state.id)
 
             # Build absolute URLs for images
             logo_url = None
@@ -852,9 +721,9 @@ class AdminStateListView(generics.ListCreateAPIView):
                     "meta_title": state.meta_title,
                     "meta_description": state.meta_description,
                     "is_active": state.is_active,
-                    "total_ads": ads_count,
-                    "active_ads": active_ads,
-                    "users_count": users_count,
+                    "total_ads": stats["total_ads"],
+                    "active_ads": stats["active_ads"],
+                    "users_count": stats["users_count"],
                     "created_at": state.created_at.isoformat(),
                     "updated_at": state.updated_at.isoformat(),
                 }
@@ -981,13 +850,15 @@ class AdminCategoryStatsView(generics.ListAPIView):
         # Base queryset
         categories = Category.objects.filter(is_active=True)
 
+        ads = Ad.objects.all()
+        if state_filter != "all":
+            ads = ads.filter(state__code=state_filter)
+        ad_stats = ContentStatsService.ad_stats("category", ads)
+
         # Prepare stats
         categories_data = []
         for category in categories:
-            ads_qs = category.ads.exclude(status="deleted")
-
-            if state_filter != "all":
-                ads_qs = ads_qs.filter(state__code=state_filter)
+            stats = ContentStatsService.get(ad_stats, category.id)
 
             categories_data.append(
                 {
@@ -998,9 +869,9 @@ class AdminCategoryStatsView(generics.ListAPIView):
                     "description": category.description,
                     "sort_order": category.sort_order,
                     "is_active": category.is_active,
-                    "total_ads": ads_qs.count(),
-                    "active_ads": ads_qs.filter(status="approved").count(),
-                    "pending_ads": ads_qs.filter(status="pending").count(),
+                    "total_ads": stats["total_ads"],
+                    "active_ads": stats["active_ads"],
+                    "pending_ads": stats["pending_ads"],
                 }
             )
 
@@ -1169,15 +1040,36 @@ def admin_settings_update(request):
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
 def admin_export_ads(request):
-    """Export ads data to CSV."""
-    import csv
-    from django.http import HttpResponse
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="ads_export.csv"'
+    """Export ads data to CSV (streamed; filters: date_from, date_to, state, status)."""
+    export_filters = get_export_filters(request)
+
+    ads = filter_by_date(Ad.objects.all(), export_filters)
+    if export_filters["state"]:
+        ads = ads.filter(state__code__iexact=export_filters["state"])
+    if export_filters["status"]:
+        ads = ads.filter(status=export_filters["status"])
+
+    rows = (
+        ads.order_by("id")
+        .values_list(
+            "id",
+            "title",
+            "user__email",
+            "category__name",
+            "city__name",
+            "state__name",
+            "price",
+            "status",
+            "plan",
+            "view_count",
+            "created_at",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
 
-    writer = csv.writer(response)
-    writer.writerow(
+    return stream_csv(
+        request,
+        "ads_export.csv",
         [
             "ID",
             "Title",
@@ -1190,82 +1082,126 @@ def admin_export_ads(request):
             "Plan",
             "Views",
             "Created At",
-        ]
+        ],
+        (
+            [*row[:-1], row[-1].strftime("%Y-%m-%d %H:%M:%S")]
+            for row in rows
+        ),
     )
 
-    ads = Ad.objects.select_related("user", "category", "city", "state").all()
-
-    for ad in ads:
-        writer.writerow(
-            [
-                ad.id,
-                ad.title,
-                ad.user.email,
-                ad.category.name,
-                ad.city.name,
-                ad.state.name,
-                ad.price,
-                ad.status,
-                ad.plan,
-                ad.view_count,
-                ad.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-            ]
-        )
-
-    return response
-
 
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
 def admin_export_users(request):
-    """Export users data to CSV."""
-    import csv
-    from django.http import HttpResponse
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="users_export.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(
-        ["ID", "Email", "Name", "Phone", "Status", "Total Ads", "Joined Date"]
+    """
+    Export users data to CSV (streamed).
+
+    Filters: date_from/date_to (joined), state (has ads in that state) and
+    status (active, suspended or banned).
+    """
+    export_filters = get_export_filters(request)
+
+    users = filter_by_date(User.objects.all(), export_filters)
+    if export_filters["state"]:
+        users = users.filter(
+            Exists(
+                Ad.objects.filter(
+                    user=OuterRef("pk"), state__code__iexact=export_filters["state"]
+                )
+            )
+        )
+    if export_filters["status"] == "active":
+        users = users.filter(is_active=True, is_suspended=False)
+    elif export_filters["status"] == "suspended":
+        users = users.filter(is_active=True, is_suspended=True)
+    elif export_filters["status"] == "banned":
+        users = users.filter(is_active=False)
+
+    rows = (
+        users.annotate(total_ads=Count("ads"))
+        .order_by("id")
+        .values_list(
+            "id",
+            "email",
+            "first_name",
+            "last_name",
+            "phone",
+            "is_active",
+            "is_suspended",
+            "total_ads",
+            "created_at",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
     )
 
-    users = User.objects.prefetch_related("ads").all()
-
-    for user in users:
-        status = "Active"
-        if not user.is_active:
-            status = "Banned"
-        elif user.is_suspended:
-            status = "Suspended"
-
-        writer.writerow(
-            [
-                user.id,
-                user.email,
-                user.get_full_name(),
-                user.phone or "",
+    def user_rows():
+        for (
+            user_id, email, first_name, last_name, phone,
+            is_active, is_suspended, total_ads, created_at,
+        ) in rows:
+            status = "Active"
+            if not is_active:
+                status = "Banned"
+            elif is_suspended:
+                status = "Suspended"
+
+            yield [
+                user_id,
+                email,
+                f"{first_name} {last_name}".strip(),
+                phone or "",
                 status,
-                user.ads.count(),
-                user.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                total_ads,
+                created_at.strftime("%Y-%m-%d %H:%M:%S"),
             ]
-        )
 
-    return response
+    return stream_csv(
+        request,
+        "users_export.csv",
+        ["ID", "Email", "Name", "Phone", "Status", "Total Ads", "Joined Date"],
+        user_rows(),
+    )
 
 
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
 def admin_export_reports(request):
-    """Export reports data to CSV."""
-    import csv
-    from django.http import HttpResponse
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="reports_export.csv"'
+    """
+    Export reports data to CSV (streamed).
+
+    Filters: date_from/date_to, state (of the reported ad) and status
+    (pending or reviewed).
+    """
+    export_filters = get_export_filters(request)
+
+    reports = filter_by_date(AdReport.objects.all(), export_filters)
+    if export_filters["state"]:
+        reports = reports.filter(ad__state__code__iexact=export_filters["state"])
+    if export_filters["status"] == "pending":
+        reports = reports.filter(is_reviewed=False)
+    elif export_filters["status"] == "reviewed":
+        reports = reports.filter(is_reviewed=True)
+
+    reasons = dict(AdReport.REASON_CHOICES)
+    rows = (
+        reports.order_by("id")
+        .values_list(
+            "id",
+            "ad_id",
+            "ad__title",
+            "reported_by__email",
+            "reason",
+            "description",
+            "is_reviewed",
+            "reviewed_by__email",
+            "created_at",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
 
-    writer = csv.writer(response)
-    writer.writerow(
+    return stream_csv(
+        request,
+        "reports_export.csv",
         [
             "ID",
             "Ad ID",
@@ -1276,70 +1212,71 @@ def admin_export_reports(request):
             "Status",
             "Reviewed By",
             "Created At",
-        ]
-    )
-
-    reports = AdReport.objects.select_related("ad", "reported_by", "reviewed_by").all()
-
-    for report in reports:
-        writer.writerow(
+        ],
+        (
             [
-                report.id,
-                report.ad.id,
-                report.ad.title,
-                report.reported_by.email if report.reported_by else "Anonymous",
-                report.get_reason_display(),
-                report.description,
-                "Reviewed" if report.is_reviewed else "Pending",
-                report.reviewed_by.email if report.reviewed_by else "",
-                report.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                report_id,
+                ad_id,
+                ad_title,
+                reported_by or "Anonymous",
+                reasons.get(reason, reason),
+                description,
+                "Reviewed" if is_reviewed else "Pending",
+                reviewed_by or "",
+                created_at.strftime("%Y-%m-%d %H:%M:%S"),
             ]
-        )
-
-    return response
+            for (
+                report_id, ad_id, ad_title, reported_by, reason,
+                description, is_reviewed, reviewed_by, created_at,
+            ) in rows
+        ),
+    )
 
 
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
 def admin_export_analytics(request):
-    """Export analytics data to CSV."""
-    import csv
-    from django.http import HttpResponse
-
-    days = int(request.GET.get("days", 30))
-    end_date = timezone.now()
+    """
+    Export analytics data to CSV (streamed).
+
+    Covers the last ``days`` days unless date_from/date_to are given;
+    ``state`` narrows ad activity (registrations stay site-wide).
+    """
+    export_filters = get_export_filters(request)
+
+    days = export_filters["days"]
+    end_date = timezone.localdate()
+    if export_filters["date_to"]:
+        end_date = export_filters["date_to"].date() - timedelta(days=1)
     start_date = end_date - timedelta(days=days)
+    if export_filters["date_from"]:
+        start_date = export_filters["date_from"].date()
 
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="analytics_export.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(["Date", "New Ads", "New Users", "Views", "Contacts"])
-
-    # Daily aggregation
-    dates = []
-    current_date = start_date.date()
-    while current_date <= end_date.date():
-        dates.append(current_date)
-        current_date += timedelta(days=1)
-
-    for date in dates:
-        new_ads = Ad.objects.filter(created_at__date=date).count()
-        new_users = User.objects.filter(created_at__date=date).count()
-        views = AdView.objects.filter(viewed_at__date=date).count()
-        contacts = AdContact.objects.filter(contacted_at__date=date).count()
-
-        writer.writerow(
-            [
-                date.strftime("%Y-%m-%d"),
-                new_ads,
-                new_users,
-                views,
-                contacts,
+    # Daily aggregation from the DailyStats rollup (one query)
+    daily = DailyStatsService.daily_totals(
+        start_date, end_date, state_filter=export_filters["state"] or "all"
+    )
+    empty = {"new_ads": 0, "new_users": 0, "views": 0, "contacts": 0}
+
+    def analytics_rows():
+        current_date = start_date
+        while current_date <= end_date:
+            totals = daily.get(current_date, empty)
+            yield [
+                current_date.strftime("%Y-%m-%d"),
+                totals["new_ads"],
+                totals["new_users"],
+                totals["views"],
+                totals["contacts"],
             ]
-        )
+            current_date += timedelta(days=1)
 
-    return response
+    return stream_csv(
+        request,
+        "analytics_export.csv",
+        ["Date", "New Ads", "New Users", "Views", "Contacts"],
+        analytics_rows(),
+    )
 
 
 # ============================================================================
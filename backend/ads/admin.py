@@ -5,6 +5,8 @@ from django.urls import reverse
 from django.utils import timezone
 from django.db.models import Count, Sum
 from .models import Ad, AdImage, AdView, AdContact, AdFavorite, AdReport
+from .listing_cache import bump_listing_versions
+from .category_counts import CategoryCountService
 
 class AdImageInline(admin.TabularInline):
     """Inline admin for ad images."""
@@ -124,30 +126,40 @@ class AdAdmin(admin.ModelAdmin):
     
     def approve_ads(self, request, queryset):
         """Bulk approve ads."""
+        rows = list(queryset.values_list('status', 'state_id', 'category_id'))
+        listings = {(state_id, category_id) for _, state_id, category_id in rows}
         updated = queryset.update(
             status='approved',
             approved_by=request.user,
             approved_at=timezone.now(),
             rejection_reason=''
         )
+        CategoryCountService.status_changed(rows, 'approved')
+        bump_listing_versions(listings)
         self.message_user(request, f'{updated} ads approved successfully.')
     approve_ads.short_description = 'Approve selected ads'
     
     def reject_ads(self, request, queryset):
         """Bulk reject ads."""
+        rows = list(queryset.values_list('status', 'state_id', 'category_id'))
+        listings = {(state_id, category_id) for _, state_id, category_id in rows}
         updated = queryset.update(
             status='rejected',
             rejection_reason='Bulk rejection by admin'
         )
+        CategoryCountService.status_changed(rows, 'rejected')
+        bump_listing_versions(listings)
         self.message_user(request, f'{updated} ads rejected.')
     reject_ads.short_description = 'Reject selected ads'
     
     def make_featured(self, request, queryset):
         """Make ads featured."""
+        listings = list(queryset.values_list('state_id', 'category_id').distinct())
         updated = queryset.update(
             plan='featured',
             featured_expires_at=timezone.now() + timezone.timedelta(days=30)
         )
+        bump_listing_versions(listings)
         self.message_user(request, f'{updated} ads made featured.')
     make_featured.short_description = 'Make selected ads featured'
     
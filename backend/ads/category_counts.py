@@ -0,0 +1,124 @@
+# ads/category_counts.py
+import logging
+from collections import Counter
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Ads in this status are counted; the expiry sweep moves lapsed ones out
+COUNTED_STATUS = "approved"
+
+
+class CategoryCountService:
+    """
+    Keeps ``content.CategoryStateCount`` in step with the ads table.
+
+    Every path that changes an ad's status, state or category reports the
+    change here (the Ad signals for single saves, the bulk moderation and
+    expiry services for ``QuerySet.update()`` calls), and the deltas are
+    applied in the same transaction. ``reconcile`` rebuilds the table from
+    scratch; run the ``reconcile_category_counts`` command periodically to
+    repair any drift.
+    """
+
+    # ========== Recording ==========
+
+    @classmethod
+    def ad_changed(cls, previous, current):
+        """
+        Record a single ad moving from ``previous`` to ``current``.
+
+        Both are (status, state_id, category_id) tuples; ``previous`` is None
+        for new ads and ``current`` is None for deleted ones.
+        """
+        deltas = Counter()
+        if previous and previous[0] == COUNTED_STATUS:
+            deltas[previous[1:]] -= 1
+        if current and current[0] == COUNTED_STATUS:
+            deltas[current[1:]] += 1
+        cls.apply(deltas)
+
+    @classmethod
+    def status_changed(cls, rows, status):
+        """
+        Record a bulk status update.
+
+        ``rows`` are the (status, state_id, category_id) values of the
+        updated ads from before the update; ``status`` is their new status.
+        """
+        deltas = Counter()
+        for previous_status, state_id, category_id in rows:
+            if previous_status == status:
+                continue
+            if previous_status == COUNTED_STATUS:
+                deltas[(state_id, category_id)] -= 1
+            elif status == COUNTED_STATUS:
+                deltas[(state_id, category_id)] += 1
+        cls.apply(deltas)
+
+    @classmethod
+    def apply(cls, deltas):
+        """Add {(state_id, category_id): delta} to the stored counts."""
+        from content.models import CategoryStateCount
+
+        deltas = {key: delta for key, delta in deltas.items() if delta and all(key)}
+        if not deltas:
+            return
+
+        # Make sure every row exists, then move it with an F() update
+        CategoryStateCount.objects.bulk_create(
+            [
+                CategoryStateCount(state_id=state_id, category_id=category_id)
+                for state_id, category_id in deltas
+            ],
+            ignore_conflicts=True,
+        )
+        now = timezone.now()
+        for (state_id, category_id), delta in deltas.items():
+            CategoryStateCount.objects.filter(
+                state_id=state_id, category_id=category_id
+            ).update(active_ads=Greatest(F("active_ads") + delta, 0), updated_at=now)
+
+    # ========== Reconciliation ==========
+
+    @classmethod
+    def reconcile(cls):
+        """Recount every (state, category) from the ads table; returns rows fixed."""
+        from content.models import CategoryStateCount
+        from .models import Ad
+
+        actual = {
+            (row["state_id"], row["category_id"]): row["total"]
+            for row in Ad.objects.filter(status=COUNTED_STATUS)
+            .order_by()
+            .values("state_id", "category_id")
+            .annotate(total=Count("id"))
+        }
+        stored = {
+            (row.state_id, row.category_id): row
+            for row in CategoryStateCount.objects.all()
+        }
+
+        now = timezone.now()
+        changed = []
+        for key, row in stored.items():
+            count = actual.get(key, 0)
+            if row.active_ads != count:
+                row.active_ads = count
+                row.updated_at = now
+                changed.append(row)
+        CategoryStateCount.objects.bulk_update(changed, ["active_ads", "updated_at"], batch_size=500)
+
+        missing = [
+            CategoryStateCount(state_id=state_id, category_id=category_id, active_ads=count)
+            for (state_id, category_id), count in actual.items()
+            if (state_id, category_id) not in stored
+        ]
+        CategoryStateCount.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+
+        fixed = len(changed) + len(missing)
+        if fixed:
+            logger.warning(f"Reconciled {fixed} category counts")
+        return fixed
@@ -0,0 +1,335 @@
+# ads/counters.py
+import atexit
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from core.cache_versions import is_shared_cache
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ("view_count", "unique_view_count", "contact_count", "favorite_count")
+
+DEFAULT_SETTINGS = {
+    "FLUSH_INTERVAL": 10,  # Seconds between background flushes (0 = write-through)
+    "CACHE_ALIAS": "default",  # Must be shared by every process (e.g. Redis)
+    "KEY_PREFIX": "ad_counter",
+    "LOCK_TIMEOUT": 60,  # Seconds a flusher may hold the flush lock
+}
+
+
+def _config():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "AD_COUNTERS", {})}
+
+
+def _cache():
+    return caches[_config()["CACHE_ALIAS"]]
+
+
+class AdCounterService:
+    """
+    Write-behind counters for the denormalized Ad engagement columns.
+
+    Deltas accumulate in the ``CACHE_ALIAS`` cache (atomic ``incr``) and are
+    applied to the database in batches with ``F()`` expressions, so hot ads
+    don't take a row lock on every view, contact or favorite toggle. Ids
+    touched by this process are flushed by a background thread; the
+    ``flush_ad_counters`` command sweeps every ad for deltas left behind by
+    other processes.
+
+    Flushes (and reconciliation) hold a lock in the cache, so the background
+    threads and the commands never apply the same pending delta twice.
+
+    Write-behind needs a cache shared by every process (Redis, Memcached)
+    that doesn't evict the delta keys. With a process-local backend such as
+    LocMemCache, increments are written through, as with
+    ``FLUSH_INTERVAL = 0``.
+    """
+
+    _lock = threading.Lock()
+    _dirty = set()
+    _worker = None
+    _wakeup = threading.Event()
+
+    # ========== Keys ==========
+
+    @staticmethod
+    def cache_key(ad_id, field):
+        """Get the cache key holding the pending delta for one counter."""
+        return f"{_config()['KEY_PREFIX']}:{field}:{ad_id}"
+
+    # ========== Recording ==========
+
+    @classmethod
+    def increment(cls, ad_id, field, delta=1):
+        """Add ``delta`` (may be negative) to a counter."""
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Unknown ad counter: {field}")
+        if not delta:
+            return
+
+        if not cls.is_write_behind():
+            cls.apply_deltas({ad_id: {field: delta}})
+            return
+
+        cache = _cache()
+        key = cls.cache_key(ad_id, field)
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # Key was evicted between add() and incr()
+            if not cache.add(key, delta, timeout=None):
+                cache.incr(key, delta)
+
+        with cls._lock:
+            cls._dirty.add(ad_id)
+        cls._ensure_worker()
+
+    @staticmethod
+    def is_write_behind():
+        """Whether increments are buffered in a shared cache."""
+        # Deltas in a per-process cache could never be swept by the
+        # commands, and are culled along with every other entry
+        return _config()["FLUSH_INTERVAL"] > 0 and is_shared_cache(
+            _config()["CACHE_ALIAS"]
+        )
+
+    @classmethod
+    def pending(cls, ad_id):
+        """Get pending (unflushed) deltas for an ad as {field: delta}."""
+        return cls.pending_many([ad_id]).get(ad_id, {})
+
+    @classmethod
+    def pending_many(cls, ad_ids):
+        """Get pending deltas as {ad_id: {field: delta}}, skipping ads with none."""
+        if not cls.is_write_behind():
+            return {}
+
+        keys = {
+            cls.cache_key(ad_id, field): (ad_id, field)
+            for ad_id in ad_ids
+            for field in COUNTER_FIELDS
+        }
+
+        deltas = defaultdict(dict)
+        for key, value in _cache().get_many(list(keys)).items():
+            if value:
+                ad_id, field = keys[key]
+                deltas[ad_id][field] = value
+        return deltas
+
+    @classmethod
+    def discard(cls, deltas):
+        """
+        Subtract {ad_id: {field: delta}} from the pending deltas.
+
+        Subtracting rather than deleting keeps increments that landed after
+        the deltas were read until the next flush.
+        """
+        cache = _cache()
+        for ad_id, fields in deltas.items():
+            for field, value in fields.items():
+                try:
+                    cache.decr(cls.cache_key(ad_id, field), value)
+                except ValueError:
+                    pass
+
+    # ========== Flushing ==========
+
+    @classmethod
+    @contextmanager
+    def flush_lock(cls, wait=True):
+        """
+        Hold the cross-process flush lock; yields whether it was acquired.
+
+        Reading, applying and discarding deltas is not atomic, so only one
+        holder may do it at a time. With ``wait`` the lock is polled for up
+        to ``LOCK_TIMEOUT`` seconds.
+        """
+        config = _config()
+        cache = _cache()
+        key = f"{config['KEY_PREFIX']}:flush_lock"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + (config["LOCK_TIMEOUT"] if wait else 0)
+
+        acquired = cache.add(key, token, timeout=config["LOCK_TIMEOUT"])
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(0.1)
+            acquired = cache.add(key, token, timeout=config["LOCK_TIMEOUT"])
+
+        try:
+            yield acquired
+        finally:
+            if acquired and cache.get(key) == token:
+                cache.delete(key)
+
+    @classmethod
+    def flush(cls, ad_ids=None):
+        """
+        Apply pending deltas to the database.
+
+        Flushes ``ad_ids`` when given, waiting for the flush lock; otherwise
+        the ads touched by this process, deferred to the next run if another
+        flusher holds the lock. Returns the number of ads updated.
+        """
+        background = ad_ids is None
+        if background:
+            with cls._lock:
+                ad_ids = cls._dirty
+                cls._dirty = set()
+
+        ad_ids = list(ad_ids)
+        if not ad_ids or not cls.is_write_behind():
+            return 0
+
+        with cls.flush_lock(wait=not background) as acquired:
+            if not acquired:
+                if background:
+                    with cls._lock:
+                        cls._dirty.update(ad_ids)
+                else:
+                    logger.warning("Ad counter flush lock busy; deltas left pending")
+                return 0
+
+            deltas = cls.pending_many(ad_ids)
+            if not deltas:
+                return 0
+
+            cls.apply_deltas(deltas)
+            cls.discard(deltas)
+
+        return len(deltas)
+
+    @staticmethod
+    def apply_deltas(deltas):
+        """Write {ad_id: {field: delta}} to the database, one UPDATE per ad."""
+        from .models import Ad
+
+        with transaction.atomic():
+            for ad_id, fields in deltas.items():
+                Ad.objects.filter(pk=ad_id).update(
+                    **{
+                        field: Greatest(F(field) + delta, Value(0))
+                        for field, delta in fields.items()
+                    }
+                )
+
+    # ========== Reconciliation ==========
+
+    @classmethod
+    def reconcile(cls, queryset=None, chunk_size=500):
+        """
+        Recompute counters from AdView/AdContact/AdFavorite rows.
+
+        The tracking rows already include events whose deltas are still
+        pending, so a counter has drifted when stored + pending differs from
+        the recount. Drifted counters are overwritten with the recount and
+        the pending deltas read for them are discarded, so a later flush
+        doesn't apply them a second time.
+
+        Returns the number of ads whose stored counters drifted.
+        """
+        from .models import Ad, AdView, AdContact, AdFavorite
+
+        def count_of(model, expression=Count("id")):
+            return Coalesce(
+                Subquery(
+                    model.objects.filter(ad=OuterRef("pk"))
+                    .order_by()
+                    .values("ad")
+                    .annotate(total=expression)
+                    .values("total"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            )
+
+        queryset = (queryset if queryset is not None else Ad.objects.all()).annotate(
+            actual_view_count=count_of(AdView),
+            actual_unique_view_count=count_of(
+                AdView, Count("ip_address", distinct=True)
+            ),
+            actual_contact_count=count_of(AdContact),
+            actual_favorite_count=count_of(AdFavorite),
+        )
+
+        def repair(chunk):
+            with cls.flush_lock() as acquired:
+                if not acquired:
+                    logger.warning("Ad counter flush lock busy; skipped a reconcile chunk")
+                    return 0
+                return repair_locked(chunk)
+
+        def repair_locked(chunk):
+            pending = cls.pending_many([ad.id for ad in chunk])
+            drifted = []
+            discarded = {}
+            for ad in chunk:
+                deltas = pending.get(ad.id, {})
+                actual = {field: getattr(ad, f"actual_{field}") for field in COUNTER_FIELDS}
+                if any(
+                    getattr(ad, field) + deltas.get(field, 0) != actual[field]
+                    for field in COUNTER_FIELDS
+                ):
+                    for field, value in actual.items():
+                        setattr(ad, field, value)
+                    drifted.append(ad)
+                    if deltas:
+                        discarded[ad.id] = deltas
+
+            if drifted:
+                Ad.objects.bulk_update(drifted, COUNTER_FIELDS)
+                cls.discard(discarded)
+            return len(drifted)
+
+        total = 0
+        chunk = []
+        for ad in queryset.only("id", *COUNTER_FIELDS).iterator(chunk_size=chunk_size):
+            chunk.append(ad)
+            if len(chunk) >= chunk_size:
+                total += repair(chunk)
+                chunk = []
+
+        if chunk:
+            total += repair(chunk)
+
+        return total
+
+    # ========== Background Worker ==========
+
+    @classmethod
+    def _ensure_worker(cls):
+        """Start the background flush thread on first use."""
+        if cls._worker and cls._worker.is_alive():
+            return
+
+        with cls._lock:
+            if cls._worker and cls._worker.is_alive():
+                return
+            cls._worker = threading.Thread(
+                target=cls._run, name="ad-counter-flusher", daemon=True
+            )
+            cls._worker.start()
+            atexit.register(cls.flush)
+
+    @classmethod
+    def _run(cls):
+        """Flush this process's dirty counters periodically."""
+        from django.db import close_old_connections
+
+        while True:
+            cls._wakeup.wait(_config()["FLUSH_INTERVAL"])
+            cls._wakeup.clear()
+            close_old_connections()
+            try:
+                cls.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush ad counters: {str(e)}")
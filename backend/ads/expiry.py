@@ -0,0 +1,141 @@
+# ads/expiry.py
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "CHUNK_SIZE": 500,  # Ads moved per UPDATE
+    "WARN_DAYS": 3,  # Warn owners this many days before expiry (0 = never)
+}
+
+
+def _config():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "AD_EXPIRY", {})}
+
+
+class AdExpiryService:
+    """
+    Batched expiry sweeps for ads and featured plans.
+
+    Each sweep locks a chunk of due ads (skipping rows another sweeper
+    holds), moves them with one UPDATE, bumps the affected listing cache
+    versions after commit and notifies the owners with one bulk insert.
+    Run periodically by the ``sweep_expired_ads`` command.
+    """
+
+    @classmethod
+    def sweep(cls, now=None, chunk_size=None):
+        """Run every sweep; returns the number of ads each one touched."""
+        now = now or timezone.now()
+        chunk_size = chunk_size or _config()["CHUNK_SIZE"]
+
+        return {
+            "expired": cls.expire_ads(now, chunk_size),
+            "featured_lapsed": cls.expire_featured(now, chunk_size),
+            "warned": cls.warn_expiring(now, chunk_size),
+        }
+
+    # ========== Sweeps ==========
+
+    @classmethod
+    def expire_ads(cls, now, chunk_size):
+        """Move approved ads past ``expires_at`` to "expired"."""
+        from .models import Ad
+
+        due = Ad.objects.filter(status="approved", expires_at__lte=now)
+        return cls._sweep(
+            due,
+            chunk_size,
+            updates={"status": "expired", "updated_at": now},
+            notification_type="ad_expired",
+            now=now,
+        )
+
+    @classmethod
+    def expire_featured(cls, now, chunk_size):
+        """Drop featured plans whose ``featured_expires_at`` has passed."""
+        from .models import Ad
+
+        due = Ad.objects.filter(plan="featured", featured_expires_at__lte=now)
+        return cls._sweep(due, chunk_size, updates={"plan": "free", "updated_at": now})
+
+    @classmethod
+    def warn_expiring(cls, now, chunk_size):
+        """Warn owners of ads expiring within WARN_DAYS, once per expiry date."""
+        from .models import Ad
+
+        warn_days = _config()["WARN_DAYS"]
+        if warn_days <= 0:
+            return 0
+
+        window = timedelta(days=warn_days)
+        due = Ad.objects.filter(
+            status="approved", expires_at__gt=now, expires_at__lte=now + window
+        ).filter(
+            # Renewing an ad pushes expires_at out, which re-arms the warning
+            Q(expiry_warning_sent_at__isnull=True)
+            | Q(expiry_warning_sent_at__lt=F("expires_at") - window)
+        )
+        return cls._sweep(
+            due,
+            chunk_size,
+            updates={"expiry_warning_sent_at": now},
+            notification_type="ad_expiring_soon",
+            now=now,
+            affects_listings=False,
+        )
+
+    @classmethod
+    def _sweep(cls, due, chunk_size, updates, notification_type=None, now=None,
+               affects_listings=True):
+        """Apply ``updates`` to ``due`` chunk by chunk; returns the rows moved."""
+        from messaging.services import NotificationService
+        from .category_counts import CategoryCountService
+        from .listing_cache import bump_listing_versions
+        from .models import Ad
+
+        total = 0
+        while True:
+            with transaction.atomic():
+                chunk = list(
+                    due.select_for_update(skip_locked=True)
+                    .order_by()
+                    .values_list("id", "status", "state_id", "category_id")[:chunk_size]
+                )
+                if not chunk:
+                    break
+
+                ids = [ad_id for ad_id, _, _, _ in chunk]
+                Ad.objects.filter(id__in=ids).update(**updates)
+
+                if "status" in updates:
+                    CategoryCountService.status_changed(
+                        [row[1:] for row in chunk], updates["status"]
+                    )
+
+                if affects_listings:
+                    listings = {
+                        (state_id, category_id)
+                        for _, status, state_id, category_id in chunk
+                        if status == "approved"
+                    }
+                    transaction.on_commit(lambda: bump_listing_versions(listings))
+
+                if notification_type:
+                    ads = Ad.objects.filter(id__in=ids).select_related("user")
+                    NotificationService.send_ad_expiry_notifications(
+                        ads, notification_type, now=now
+                    )
+
+            total += len(ids)
+            if len(chunk) < chunk_size:
+                break
+
+        if total:
+            logger.info(f"Expiry sweep applied {updates} to {total} ads")
+        return total
@@ -0,0 +1,197 @@
+# ads/images.py
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "WORKERS": 2,  # Processing threads per process (0 = process inline)
+    "VARIANTS": {  # name -> bounding box; aspect ratio is kept
+        "thumb": (400, 300),
+        "medium": (1024, 768),
+    },
+    "JPEG_QUALITY": 82,
+    "WEBP_QUALITY": 80,
+}
+
+# EXIF orientations that swap width and height
+_ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+_EXIF_ORIENTATION = 0x0112
+
+
+def _config():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "AD_IMAGES", {})}
+
+
+class AdImageProcessor:
+    """
+    Upload pipeline for AdImage files.
+
+    ``read_dimensions`` runs inline on save (header only). Everything heavy
+    runs in a bounded thread pool after commit: EXIF metadata is stripped
+    from the original (orientation applied first) and each configured
+    variant is written as JPEG and WebP next to it, then recorded in
+    ``AdImage.variants``. The ``process_ad_images`` command backfills
+    existing images.
+    """
+
+    _lock = threading.Lock()
+    _executor = None
+
+    # ========== Inline ==========
+
+    @staticmethod
+    def read_dimensions(file):
+        """Get the displayed (width, height) of an image file, or (None, None)."""
+        try:
+            position = file.tell()
+            with Image.open(file) as img:
+                width, height = img.size
+                if img.getexif().get(_EXIF_ORIENTATION) in _ROTATED_ORIENTATIONS:
+                    width, height = height, width
+            file.seek(position)
+            return width, height
+        except Exception as e:
+            logger.warning(f"Could not read image dimensions: {e}")
+            return None, None
+
+    # ========== Background ==========
+
+    @classmethod
+    def submit(cls, image_id):
+        """Process an AdImage once the current transaction commits."""
+        if _config()["WORKERS"] <= 0:
+            transaction.on_commit(lambda: cls.process(image_id))
+            return
+        transaction.on_commit(lambda: cls._get_executor().submit(cls._run, image_id))
+
+    @classmethod
+    def _get_executor(cls):
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=_config()["WORKERS"], thread_name_prefix="ad-images"
+                    )
+        return cls._executor
+
+    @classmethod
+    def _run(cls, image_id):
+        close_old_connections()
+        try:
+            cls.process(image_id)
+        except Exception as e:
+            logger.error(f"Failed to process ad image {image_id}: {e}")
+        finally:
+            close_old_connections()
+
+    @classmethod
+    def process(cls, image_id):
+        """Strip EXIF from an AdImage and (re)generate its variants."""
+        from .listing_cache import bump_listing_versions
+        from .models import Ad, AdImage
+
+        ad_image = AdImage.objects.filter(pk=image_id).first()
+        if ad_image is None or not ad_image.image:
+            return
+
+        config = _config()
+        storage = ad_image.image.storage
+        original_name = ad_image.image.name
+
+        with storage.open(original_name, "rb") as file:
+            img = Image.open(file)
+            img.load()
+        source_format = img.format or "JPEG"
+        has_metadata = bool(img.getexif()) or "exif" in img.info
+        img = ImageOps.exif_transpose(img)
+
+        updates = {
+            "width": img.width,
+            "height": img.height,
+            "processed_at": timezone.now(),
+        }
+
+        if has_metadata:
+            # Re-encode without metadata (GPS, camera serials, ...) and drop
+            # the old file so the EXIF is gone for good. Storages that
+            # overwrite in place return the same name; nothing to drop then.
+            new_name = storage.save(original_name, cls._encode(img, source_format, config))
+            if new_name != original_name:
+                storage.delete(original_name)
+            original_name = new_name
+            updates["image"] = new_name
+            updates["file_size"] = storage.size(new_name)
+
+        base, _ = os.path.splitext(original_name)
+        variants = {}
+        for name, size in config["VARIANTS"].items():
+            variant = img.copy()
+            variant.thumbnail(tuple(size), Image.LANCZOS)
+            variants[name] = {
+                "width": variant.width,
+                "height": variant.height,
+                "jpeg": storage.save(f"{base}_{name}.jpg", cls._encode(variant, "JPEG", config)),
+                "webp": storage.save(f"{base}_{name}.webp", cls._encode(variant, "WEBP", config)),
+            }
+
+        # Replace the files of an earlier run
+        for old in (ad_image.variants or {}).values():
+            for key in ("jpeg", "webp"):
+                if old.get(key) and old[key] not in (v[key] for v in variants.values()):
+                    storage.delete(old[key])
+
+        updates["variants"] = variants
+        AdImage.objects.filter(pk=image_id).update(**updates)
+
+        # The update bypasses the AdImage signals; listings show primary images
+        listing = (
+            Ad.objects.filter(pk=ad_image.ad_id, status="approved")
+            .values_list("state_id", "category_id")
+            .first()
+        )
+        if listing and ad_image.is_primary:
+            bump_listing_versions([listing])
+
+    @staticmethod
+    def _encode(img, image_format, config):
+        """Encode ``img`` without metadata; returns a ContentFile."""
+        buffer = io.BytesIO()
+        image_format = image_format.upper()
+
+        if image_format == "JPEG":
+            if img.mode != "RGB":
+                img = _flatten(img)
+            img.save(buffer, "JPEG", quality=config["JPEG_QUALITY"], optimize=True, progressive=True)
+        elif image_format == "WEBP":
+            img.save(buffer, "WEBP", quality=config["WEBP_QUALITY"], method=4)
+        else:
+            img.save(buffer, image_format)
+
+        return ContentFile(buffer.getvalue())
+
+
+def _flatten(img):
+    """Convert to RGB, compositing any transparency onto white."""
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def variant_url(ad_image, name="thumb", image_format="jpeg"):
+    """Get the URL of an AdImage variant, or None if it isn't processed yet."""
+    path = (ad_image.variants or {}).get(name, {}).get(image_format)
+    if not path:
+        return None
+    return ad_image.image.storage.url(path)
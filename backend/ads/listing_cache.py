@@ -0,0 +1,43 @@
+# ads/listing_cache.py
+from core.cache_versions import bump_version
+
+LISTING_CACHE_PREFIX = "ad_listing"
+
+
+def listing_scope(state_code, category_id=None):
+    """Version scope for public listings of a state, optionally one category."""
+    scope = f"{LISTING_CACHE_PREFIX}:state:{(state_code or '').upper()}"
+    if category_id:
+        scope = f"{scope}:category:{category_id}"
+    return scope
+
+
+def bump_listing_versions(pairs):
+    """
+    Invalidate cached listings for the given (state_id, category_id) pairs.
+
+    Use after ``QuerySet.update()`` calls that change what public listings
+    show, since those bypass the Ad model signals.
+    """
+    from content.models import State
+
+    pairs = {(state_id, category_id) for state_id, category_id in pairs if state_id}
+    if not pairs:
+        return
+
+    codes = dict(
+        State.objects.filter(id__in={state_id for state_id, _ in pairs}).values_list(
+            "id", "code"
+        )
+    )
+
+    scopes = set()
+    for state_id, category_id in pairs:
+        code = codes.get(state_id)
+        if code:
+            scopes.add(listing_scope(code))
+            if category_id:
+                scopes.add(listing_scope(code, category_id))
+
+    bump_version(*scopes)
+
@@ -0,0 +1,37 @@
+# ads/management/commands/flush_ad_counters.py
+from django.core.management.base import BaseCommand
+from ads.counters import AdCounterService
+from ads.models import Ad
+
+
+class Command(BaseCommand):
+    help = 'Apply pending view/contact/favorite counter deltas to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of ads checked for pending deltas per batch',
+        )
+
+    def handle(self, *args, **options):
+        if not AdCounterService.is_write_behind():
+            self.stdout.write('Counters are written through; nothing to flush')
+            return
+
+        chunk_size = options['chunk_size']
+        ad_ids = Ad.objects.order_by('id').values_list('id', flat=True)
+
+        total = 0
+        batch = []
+        for ad_id in ad_ids.iterator(chunk_size=chunk_size):
+            batch.append(ad_id)
+            if len(batch) >= chunk_size:
+                total += AdCounterService.flush(batch)
+                batch = []
+
+        if batch:
+            total += AdCounterService.flush(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Flushed counters for {total} ads'))
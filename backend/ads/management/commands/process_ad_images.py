@@ -0,0 +1,33 @@
+# ads/management/commands/process_ad_images.py
+from django.core.management.base import BaseCommand
+from ads.images import AdImageProcessor
+from ads.models import AdImage
+
+
+class Command(BaseCommand):
+    help = 'Strip EXIF metadata and generate thumbnail/WebP variants for ad images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Reprocess every image, not only the ones never processed',
+        )
+
+    def handle(self, *args, **options):
+        images = AdImage.objects.all()
+        if not options['all']:
+            images = images.filter(processed_at__isnull=True)
+
+        processed = failed = 0
+        for image_id in images.order_by('id').values_list('id', flat=True).iterator():
+            try:
+                AdImageProcessor.process(image_id)
+                processed += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'Image {image_id}: {e}')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Processed {processed} images ({failed} failed)')
+        )
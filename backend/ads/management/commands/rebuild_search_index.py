@@ -0,0 +1,33 @@
+# ads/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from ads.search import AdSearchIndex
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for ads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of ads written to the index per batch',
+        )
+
+    def handle(self, *args, **options):
+        if not AdSearchIndex.is_supported():
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Full-text search is not supported on {connection.vendor}; '
+                    'searches use icontains matching.'
+                )
+            )
+            return
+
+        with transaction.atomic():
+            AdSearchIndex.drop_table(connection)
+            AdSearchIndex.create_table(connection)
+            total = AdSearchIndex.rebuild(chunk_size=options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} ads'))
@@ -0,0 +1,36 @@
+# ads/management/commands/reconcile_ad_counters.py
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from ads.counters import AdCounterService
+from ads.models import Ad
+
+
+class Command(BaseCommand):
+    help = 'Recompute ad view/contact/favorite counters from the tracking tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ad',
+            type=int,
+            action='append',
+            dest='ad_ids',
+            help='Only reconcile this ad id (can be repeated)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of ads processed per batch',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Ad.objects.all()
+        if options['ad_ids']:
+            queryset = queryset.filter(id__in=options['ad_ids'])
+            AdCounterService.flush(options['ad_ids'])
+        else:
+            call_command('flush_ad_counters', stdout=self.stdout)
+
+        fixed = AdCounterService.reconcile(queryset, chunk_size=options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'Repaired counters on {fixed} ads'))
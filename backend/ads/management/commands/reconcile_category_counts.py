@@ -0,0 +1,12 @@
+# ads/management/commands/reconcile_category_counts.py
+from django.core.management.base import BaseCommand
+from ads.category_counts import CategoryCountService
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-state category ad counts from the ads table'
+
+    def handle(self, *args, **options):
+        fixed = CategoryCountService.reconcile()
+
+        self.stdout.write(self.style.SUCCESS(f'Repaired {fixed} category counts'))
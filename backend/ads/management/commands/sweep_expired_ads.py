@@ -0,0 +1,24 @@
+# ads/management/commands/sweep_expired_ads.py
+from django.core.management.base import BaseCommand
+from ads.expiry import AdExpiryService
+
+
+class Command(BaseCommand):
+    help = 'Expire lapsed ads and featured plans, and warn owners of ads about to expire'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help='Number of ads moved per UPDATE (default: AD_EXPIRY CHUNK_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        result = AdExpiryService.sweep(chunk_size=options['chunk_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Expired {result['expired']} ads, ended {result['featured_lapsed']} "
+                f"featured plans, warned {result['warned']} owners"
+            )
+        )
@@ -0,0 +1,31 @@
+# Creates the full-text search index for ads (FTS5 on SQLite, tsvector/GIN on PostgreSQL)
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from ads.search import AdSearchIndex
+
+    conn = schema_editor.connection
+    if not AdSearchIndex.is_supported(conn):
+        return
+
+    AdSearchIndex.create_table(conn)
+    AdSearchIndex.rebuild(apps.get_model('ads', 'Ad').objects.all(), conn=conn)
+
+
+def drop_search_index(apps, schema_editor):
+    from ads.search import AdSearchIndex
+
+    AdSearchIndex.drop_table(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0003_alter_ad_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0004_ad_search_index'),
+        ('content', '0002_city_photo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='expiry_warning_sent_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the owner was last warned about expiry (see ads.expiry)', null=True, verbose_name='Expiry Warning Sent At'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['status', 'expires_at'], name='ads_ad_status_ecc189_idx'),
+        ),
+    ]
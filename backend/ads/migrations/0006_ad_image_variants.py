@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0005_ad_expiry_sweep'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adimage',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Processed At'),
+        ),
+        migrations.AddField(
+            model_name='adimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Variants'),
+        ),
+    ]
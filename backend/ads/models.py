@@ -1,22 +1,27 @@
 # ads/models.py
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Count, Q, Avg
+from django.db.models import Count, Q, Avg, Prefetch
 from datetime import timedelta, datetime
 from decimal import Decimal
 from core.utils import generate_unique_slug, generate_unique_filename
 
 User = get_user_model()
 
+# Saves retried when a concurrently created ad takes the generated slug
+SLUG_SAVE_ATTEMPTS = 3
+
 
 class AdManager(models.Manager):
     """Custom manager for Ad model with common filters."""
 
     def active(self):
         """Get active (approved, non-expired) ads."""
+        # ads.expiry moves lapsed ads to "expired", so the expires_at check
+        # only guards the gap between sweeps
         return self.filter(status="approved", expires_at__gt=timezone.now())
 
     def for_state(self, state_code):
@@ -201,6 +206,13 @@ class Ad(models.Model):
     expires_at = models.DateTimeField(
         _("Expires At"), help_text=_("When this ad expires")
     )
+    expiry_warning_sent_at = models.DateTimeField(
+        _("Expiry Warning Sent At"),
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("When the owner was last warned about expiry (see ads.expiry)"),
+    )
 
     # Admin fields
     approved_at = models.DateTimeField(_("Approved At"), null=True, blank=True)
@@ -248,6 +260,7 @@ class Ad(models.Model):
             models.Index(fields=["user", "-created_at"]),
             models.Index(fields=["plan", "status"]),
             models.Index(fields=["expires_at"]),
+            models.Index(fields=["status", "expires_at"]),
             models.Index(fields=["featured_expires_at"]),
             models.Index(fields=["slug"]),
         ]
@@ -255,8 +268,21 @@ class Ad(models.Model):
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what listings this ad appeared in (see ads.signals)
+        loaded = dict(zip(field_names, values))
+        instance._listing_snapshot = {
+            field: loaded[field]
+            for field in ("status", "state_id", "category_id")
+            if field in loaded
+        }
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.slug:
+        generated_slug = not self.slug
+        if generated_slug:
             self.slug = generate_unique_slug(self, self.title)
 
         # Set expiration date if not set
@@ -268,7 +294,23 @@ class Ad(models.Model):
         if self.plan == "featured" and not self.featured_expires_at:
             self.featured_expires_at = timezone.now() + timedelta(days=30)
 
-        super().save(*args, **kwargs)
+        if not generated_slug:
+            super().save(*args, **kwargs)
+            return
+
+        # Another ad with the same title may take the slug between generating
+        # and inserting it; pick the next one and try again
+        for attempt in range(SLUG_SAVE_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                if attempt == SLUG_SAVE_ATTEMPTS - 1 or not Ad.objects.filter(
+                    slug=self.slug
+                ).exists():
+                    raise
+                self.slug = generate_unique_slug(self, self.title)
 
     @property
     def is_active(self):
@@ -290,6 +332,9 @@ class Ad(models.Model):
     @property
     def primary_image(self):
         """Get the primary image for this ad."""
+        # Listings load it for the whole page with AdImage.prefetch_primary()
+        if hasattr(self, "primary_images"):
+            return self.primary_images[0] if self.primary_images else None
         return self.images.filter(is_primary=True).first()
 
     @property
@@ -335,16 +380,18 @@ class Ad(models.Model):
             return "Just now"
 
     def increment_view_count(self, unique=False):
-        """Increment view count."""
-        self.view_count += 1
+        """Increment view count (write-behind, see ads.counters)."""
+        from .counters import AdCounterService
+
+        AdCounterService.increment(self.pk, "view_count")
         if unique:
-            self.unique_view_count += 1
-        self.save(update_fields=["view_count", "unique_view_count"])
+            AdCounterService.increment(self.pk, "unique_view_count")
 
     def increment_contact_count(self):
         """Increment contact count when someone views contact info."""
-        self.contact_count += 1
-        self.save(update_fields=["contact_count"])
+        from .counters import AdCounterService
+
+        AdCounterService.increment(self.pk, "contact_count")
 
     def get_analytics_data(self, days=30):
         """Get analytics data for this ad."""
@@ -401,6 +448,12 @@ class AdImage(models.Model):
     width = models.PositiveIntegerField(_("Width"), null=True, blank=True)
     height = models.PositiveIntegerField(_("Height"), null=True, blank=True)
 
+    # Generated by ads.images: {name: {"width", "height", "jpeg", "webp"}}
+    variants = models.JSONField(_("Variants"), default=dict, blank=True, editable=False)
+    processed_at = models.DateTimeField(
+        _("Processed At"), null=True, blank=True, editable=False
+    )
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -416,15 +469,34 @@ class AdImage(models.Model):
     def __str__(self):
         return f"Image for {self.ad.title}"
 
+    @staticmethod
+    def prefetch_primary(lookup="images"):
+        """
+        Prefetch the primary image of each ad into ``Ad.primary_images``.
+
+        ``lookup`` is the path to the ads' images, e.g. ``"ad__images"`` when
+        listing conversations; one query then covers the whole page.
+        """
+        return Prefetch(
+            lookup,
+            queryset=AdImage.objects.filter(is_primary=True).order_by(
+                "sort_order", "created_at"
+            ),
+            to_attr="primary_images",
+        )
+
     def save(self, *args, **kwargs):
         # If this is set as primary, make sure other images for the same ad are not primary
         if self.is_primary:
             AdImage.objects.filter(ad=self.ad, is_primary=True).update(is_primary=False)
 
-        # Set file metadata
-        if self.image:
+        # Set file metadata (fresh uploads only; ads.images rewrites it later)
+        if self.image and not self.image._committed:
+            from .images import AdImageProcessor
+
             self.file_size = self.image.size
-            # You can add PIL here to get width/height if needed
+            self.width, self.height = AdImageProcessor.read_dimensions(self.image.file)
+            self._image_uploaded = True
 
         super().save(*args, **kwargs)
 
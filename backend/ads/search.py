@@ -0,0 +1,257 @@
+# ads/search.py
+import re
+import logging
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "ads_ad_search"
+
+# Relative weight of each indexed column (title, description, keywords, category)
+COLUMN_WEIGHTS = (10.0, 1.0, 5.0, 3.0)
+
+# Hard cap on the number of terms taken from user input
+MAX_QUERY_TERMS = 10
+
+
+class AdSearchIndex:
+    """
+    Inverted index over ad title, description, keywords and category name.
+
+    SQLite uses an FTS5 virtual table keyed by the ad id (rowid), PostgreSQL
+    uses a side table holding a weighted tsvector with a GIN index. Other
+    database backends report the index as unsupported and callers fall back
+    to plain icontains filtering.
+    """
+
+    _available = None
+
+    # ========== Backend Detection ==========
+
+    @staticmethod
+    def is_supported(conn=None):
+        """Check whether the database backend has a full-text implementation."""
+        conn = conn or connection
+        return conn.vendor in ("sqlite", "postgresql")
+
+    @classmethod
+    def is_available(cls):
+        """Check (once per process) that the index table actually exists."""
+        if cls._available is None:
+            cls._available = cls.is_supported() and SEARCH_TABLE in (
+                connection.introspection.table_names()
+            )
+        return cls._available
+
+    # ========== Schema ==========
+
+    @staticmethod
+    def create_table(conn):
+        """Create the index table for the given connection."""
+        with conn.cursor() as cursor:
+            if conn.vendor == "sqlite":
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                    "title, description, keywords, category, "
+                    "tokenize = 'porter unicode61')"
+                )
+            elif conn.vendor == "postgresql":
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+                    "ad_id bigint PRIMARY KEY REFERENCES ads_ad (id) "
+                    "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                    "document tsvector NOT NULL)"
+                )
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_gin "
+                    f"ON {SEARCH_TABLE} USING GIN (document)"
+                )
+
+    @staticmethod
+    def drop_table(conn):
+        """Drop the index table for the given connection."""
+        if conn.vendor in ("sqlite", "postgresql"):
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    # ========== Index Maintenance ==========
+
+    @staticmethod
+    def document_for(ad):
+        """Get the indexed column values for an ad."""
+        return [
+            ad.title or "",
+            ad.description or "",
+            (ad.keywords or "").replace(",", " "),
+            ad.category.name if ad.category_id else "",
+        ]
+
+    @classmethod
+    def update(cls, ad):
+        """Insert or replace the index entry for a single ad."""
+        if not cls.is_available():
+            return
+        cls._write_rows([(ad.pk, *cls.document_for(ad))])
+
+    @classmethod
+    def remove(cls, ad_id):
+        """Remove an ad from the index."""
+        if not cls.is_available():
+            return
+        column = "rowid" if connection.vendor == "sqlite" else "ad_id"
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {column} = %s", [ad_id])
+
+    @classmethod
+    def rebuild(cls, queryset=None, chunk_size=500, conn=None):
+        """
+        (Re)index the ads in ``queryset`` (all ads by default).
+
+        Returns the number of ads written to the index.
+        """
+        conn = conn or connection
+        if not cls.is_supported(conn):
+            return 0
+
+        if queryset is None:
+            from .models import Ad
+
+            queryset = Ad.objects.all()
+
+        rows = queryset.values_list(
+            "id", "title", "description", "keywords", "category__name"
+        ).order_by("id")
+
+        batch = []
+        total = 0
+        for ad_id, title, description, keywords, category in rows.iterator(
+            chunk_size=chunk_size
+        ):
+            batch.append(
+                (
+                    ad_id,
+                    title or "",
+                    description or "",
+                    (keywords or "").replace(",", " "),
+                    category or "",
+                )
+            )
+            if len(batch) >= chunk_size:
+                cls._write_rows(batch, conn)
+                total += len(batch)
+                batch = []
+
+        if batch:
+            cls._write_rows(batch, conn)
+            total += len(batch)
+
+        return total
+
+    @staticmethod
+    def _write_rows(rows, conn=None):
+        """Upsert (ad_id, title, description, keywords, category) tuples."""
+        conn = conn or connection
+        with conn.cursor() as cursor:
+            if conn.vendor == "sqlite":
+                # FTS5 has no upsert - delete then insert
+                cursor.executemany(
+                    f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s",
+                    [(row[0],) for row in rows],
+                )
+                cursor.executemany(
+                    f"INSERT INTO {SEARCH_TABLE} "
+                    "(rowid, title, description, keywords, category) "
+                    "VALUES (%s, %s, %s, %s, %s)",
+                    rows,
+                )
+            elif conn.vendor == "postgresql":
+                cursor.executemany(
+                    f"INSERT INTO {SEARCH_TABLE} (ad_id, document) VALUES (%s, "
+                    "setweight(to_tsvector('english', %s), 'A') || "
+                    "setweight(to_tsvector('english', %s), 'D') || "
+                    "setweight(to_tsvector('english', %s), 'B') || "
+                    "setweight(to_tsvector('english', %s), 'C')) "
+                    "ON CONFLICT (ad_id) DO UPDATE SET document = EXCLUDED.document",
+                    [(row[0], row[1], row[2], row[3], row[4]) for row in rows],
+                )
+
+    # ========== Querying ==========
+
+    @staticmethod
+    def parse_terms(text):
+        """Split user input into safe, lower-cased search terms."""
+        return re.findall(r"\w+", (text or "").lower())[:MAX_QUERY_TERMS]
+
+    @classmethod
+    def build_query(cls, text):
+        """
+        Build a backend-specific match expression from user input.
+
+        Every term is prefix-matched and all terms must be present.
+        Returns None when the input contains no searchable terms.
+        """
+        terms = cls.parse_terms(text)
+        if not terms:
+            return None
+
+        if connection.vendor == "sqlite":
+            return " ".join(f'"{term}"*' for term in terms)
+        return " & ".join(f"{term}:*" for term in terms)
+
+    @classmethod
+    def search(cls, queryset, text):
+        """
+        Filter ``queryset`` to ads matching ``text`` and annotate ``rank``.
+
+        Higher ``rank`` means a more relevant match on every backend.
+        """
+        query = cls.build_query(text)
+        if query is None:
+            return queryset
+
+        ad_table = queryset.model._meta.db_table
+
+        if connection.vendor == "sqlite":
+            weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+            matches = RawSQL(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+                [query],
+            )
+            # bm25() is negative with lower meaning better - flip the sign
+            rank = RawSQL(
+                f"SELECT -bm25({SEARCH_TABLE}, {weights}) FROM {SEARCH_TABLE} "
+                f"WHERE {SEARCH_TABLE} MATCH %s AND rowid = {ad_table}.id",
+                [query],
+            )
+        else:
+            matches = RawSQL(
+                f"SELECT ad_id FROM {SEARCH_TABLE} "
+                "WHERE document @@ to_tsquery('english', %s)",
+                [query],
+            )
+            rank = RawSQL(
+                f"SELECT ts_rank(document, to_tsquery('english', %s)) "
+                f"FROM {SEARCH_TABLE} WHERE ad_id = {ad_table}.id",
+                [query],
+            )
+
+        return queryset.filter(id__in=matches).annotate(rank=rank)
+
+
+class AdSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter backed by AdSearchIndex.
+
+    Annotates a ``rank`` column so ``sort_by=relevance`` orders by match
+    quality. Falls back to DRF's icontains search over ``search_fields``
+    when the full-text index is not available.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not AdSearchIndex.is_available():
+            return super().filter_queryset(request, queryset, view)
+
+        search_terms = request.query_params.get(self.search_param, "")
+        return AdSearchIndex.search(queryset, search_terms)
@@ -3,6 +3,7 @@ from rest_framework import serializers
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from .models import Ad, AdImage, AdView, AdContact, AdFavorite, AdReport
+from .images import variant_url
 from content.serializers import (
     CitySimpleSerializer,
     StateSimpleSerializer,
@@ -16,11 +17,17 @@ User = get_user_model()
 class AdImageSerializer(serializers.ModelSerializer):
     """Serializer for ad images."""
 
+    # Generated variants; null until ads.images has processed the upload
+    thumbnail = serializers.SerializerMethodField()
+    thumbnail_webp = serializers.SerializerMethodField()
+
     class Meta:
         model = AdImage
         fields = [
             "id",
             "image",
+            "thumbnail",
+            "thumbnail_webp",
             "caption",
             "is_primary",
             "sort_order",
@@ -31,6 +38,19 @@ class AdImageSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "file_size", "width", "height", "created_at"]
 
+    def get_thumbnail(self, obj):
+        return self._variant_url(obj, "jpeg")
+
+    def get_thumbnail_webp(self, obj):
+        return self._variant_url(obj, "webp")
+
+    def _variant_url(self, obj, image_format):
+        url = variant_url(obj, "thumb", image_format)
+        request = self.context.get("request")
+        if url and request:
+            return request.build_absolute_uri(url)
+        return url
+
 
 class AdImageCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating ad images."""
@@ -83,7 +103,7 @@ class AdListSerializer(serializers.ModelSerializer):
         """Check if the current user owns this ad."""
         request = self.context.get("request")
         if request and request.user.is_authenticated:
-            return obj.user == request.user
+            return obj.user_id == request.user.id
         return False
 
 
@@ -188,7 +208,7 @@ class AdDetailSerializer(serializers.ModelSerializer):
         """Check if the current user owns this ad."""
         request = self.context.get("request")
         if request and request.user.is_authenticated:
-            return obj.user == request.user
+            return obj.user_id == request.user.id
         return False
     
     def to_representation(self, instance):
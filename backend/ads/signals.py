@@ -0,0 +1,155 @@
+# ads/signals.py
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from content.models import Category
+from .models import Ad, AdImage
+from .search import AdSearchIndex
+from .images import AdImageProcessor
+from .listing_cache import bump_listing_versions
+from .category_counts import CategoryCountService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fields whose changes require the ad to be re-indexed
+SEARCH_INDEX_FIELDS = {"title", "description", "keywords", "category"}
+
+# Fields that never show up differently in public listings
+LISTING_IGNORED_FIELDS = {
+    "view_count",
+    "unique_view_count",
+    "contact_count",
+    "favorite_count",
+    "updated_at",
+}
+
+
+@receiver(post_save, sender=Ad)
+def index_ad(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the full-text index in sync with every ad save."""
+
+    # Counter-only saves (views, contacts, ...) don't touch indexed text
+    if update_fields and not SEARCH_INDEX_FIELDS.intersection(update_fields):
+        return
+
+    AdSearchIndex.update(instance)
+
+
+@receiver(post_delete, sender=Ad)
+def unindex_ad(sender, instance, **kwargs):
+    """Remove deleted ads from the full-text index."""
+    AdSearchIndex.remove(instance.pk)
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_name(sender, instance, **kwargs):
+    """Remember the previous category name to detect renames."""
+    if instance.pk:
+        instance._previous_name = (
+            Category.objects.filter(pk=instance.pk)
+            .values_list("name", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_ads(sender, instance, created, **kwargs):
+    """Re-index a category's ads when the category is renamed."""
+    previous_name = getattr(instance, "_previous_name", None)
+
+    if not created and previous_name is not None and previous_name != instance.name:
+        count = AdSearchIndex.rebuild(Ad.objects.filter(category=instance))
+        logger.info(
+            f"Category renamed '{previous_name}' -> '{instance.name}', re-indexed {count} ads"
+        )
+
+
+LISTING_SNAPSHOT_FIELDS = ("status", "state_id", "category_id")
+
+
+@receiver(pre_save, sender=Ad)
+def complete_listing_snapshot(sender, instance, update_fields=None, **kwargs):
+    """
+    Load the listing fields Ad.from_db didn't see (.only()/.defer() loads).
+
+    Without them an already approved ad would look new to the category
+    counts and be counted twice.
+    """
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields and set(update_fields) <= LISTING_IGNORED_FIELDS:
+        return
+
+    snapshot = getattr(instance, "_listing_snapshot", {})
+    missing = [field for field in LISTING_SNAPSHOT_FIELDS if field not in snapshot]
+    if missing:
+        stored = Ad.objects.filter(pk=instance.pk).values(*missing).first() or {}
+        instance._listing_snapshot = {**snapshot, **stored}
+
+
+# Registered before invalidate_ad_listings, which replaces the snapshot
+@receiver(post_save, sender=Ad)
+def update_category_counts(sender, instance, created, update_fields=None, **kwargs):
+    """Move the ad between per-state category counts when it is (un)listed."""
+    if update_fields and set(update_fields) <= LISTING_IGNORED_FIELDS:
+        return
+
+    previous = getattr(instance, "_listing_snapshot", {})
+    CategoryCountService.ad_changed(
+        (previous.get("status"), previous.get("state_id"), previous.get("category_id")),
+        (instance.status, instance.state_id, instance.category_id),
+    )
+
+
+@receiver(post_save, sender=Ad)
+def invalidate_ad_listings(sender, instance, created, update_fields=None, **kwargs):
+    """Bump listing cache versions when a listed (or previously listed) ad changes."""
+    if update_fields and set(update_fields) <= LISTING_IGNORED_FIELDS:
+        return
+
+    previous = getattr(instance, "_listing_snapshot", {})
+
+    if instance.status == "approved" or previous.get("status") == "approved":
+        bump_listing_versions(
+            [
+                (instance.state_id, instance.category_id),
+                (previous.get("state_id"), previous.get("category_id")),
+            ]
+        )
+
+    instance._listing_snapshot = {
+        "status": instance.status,
+        "state_id": instance.state_id,
+        "category_id": instance.category_id,
+    }
+
+
+@receiver(post_delete, sender=Ad)
+def invalidate_deleted_ad_listings(sender, instance, **kwargs):
+    """Bump listing cache versions when a listed ad is deleted."""
+    if instance.status == "approved":
+        bump_listing_versions([(instance.state_id, instance.category_id)])
+        CategoryCountService.ad_changed(
+            (instance.status, instance.state_id, instance.category_id), None
+        )
+
+
+@receiver(post_save, sender=AdImage)
+@receiver(post_delete, sender=AdImage)
+def invalidate_ad_image_listings(sender, instance, **kwargs):
+    """Listings show the primary image, so image changes invalidate them too."""
+    ad = (
+        Ad.objects.filter(pk=instance.ad_id, status="approved")
+        .values_list("state_id", "category_id")
+        .first()
+    )
+    if ad:
+        bump_listing_versions([ad])
+
+
+@receiver(post_save, sender=AdImage)
+def process_ad_image(sender, instance, **kwargs):
+    """Strip EXIF and build the variants of newly uploaded images."""
+    if getattr(instance, "_image_uploaded", False):
+        instance._image_uploaded = False
+        AdImageProcessor.submit(instance.pk)
@@ -1,3 +1,73 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import User
+from content.models import Category, City, State
+from .models import Ad, AdImage
+from .serializers import AdListSerializer
+
+
+class PrimaryImagePrefetchTests(TestCase):
+    """Listings load every primary image with one query, however long the page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.state = State.objects.create(
+            code="IL",
+            name="Illinois",
+            domain="desiloginil.com",
+            meta_title="IL",
+            meta_description="IL",
+            logo="logo.png",
+        )
+        cls.city = City.objects.create(name="Chicago", state=cls.state)
+        cls.category = Category.objects.create(name="Electronics", icon="icon")
+        cls.user = User.objects.create(email="seller@example.com", first_name="Sam")
+
+    def setUp(self):
+        cache.clear()
+
+    def create_ads(self, count):
+        for i in range(count):
+            ad = Ad.objects.create(
+                title=f"Phone {i}",
+                description="A phone in good condition",
+                user=self.user,
+                category=self.category,
+                city=self.city,
+                state=self.state,
+                status="approved",
+                price=100,
+            )
+            # Already stored files, so nothing is uploaded or processed
+            AdImage.objects.create(ad=ad, image=f"adimages/{i}-b.jpg", sort_order=1)
+            AdImage.objects.create(
+                ad=ad, image=f"adimages/{i}-a.jpg", sort_order=0, is_primary=True
+            )
+
+    def test_primary_image_uses_prefetch(self):
+        self.create_ads(3)
+        ads = Ad.objects.select_related("category", "city", "state", "user").prefetch_related(
+            AdImage.prefetch_primary()
+        )
+
+        # One query for the ads, one for all of their primary images
+        with self.assertNumQueries(2):
+            data = AdListSerializer(ads, many=True).data
+
+        for ad in data:
+            self.assertTrue(ad["primary_image"]["image"].endswith("-a.jpg"))
+
+    def test_listing_page_query_count(self):
+        client = APIClient()
+        # Warm the state lookups; new ads then invalidate the cached listing
+        client.get("/api/ads/ads/")
+        self.create_ads(20)
+
+        # Count, ads and one query for all of their primary images
+        with self.assertNumQueries(3):
+            response = client.get("/api/ads/ads/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 20)
@@ -0,0 +1,225 @@
+# ads/view_tracking.py
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "BATCH_SIZE": 500,  # Flush as soon as this many events are buffered
+    "FLUSH_INTERVAL": 5,  # Seconds between background flushes (0 = flush inline)
+    "DEDUPE_TTL": 3600,  # Seconds a (ad, session) pair is remembered in-process
+}
+
+
+class AdViewBuffer:
+    """
+    Process-local buffer for ad view events.
+
+    ``record`` only touches memory: events are deduped by (ad, session) and
+    flushed by a background thread with one ``bulk_create`` for the AdView
+    rows plus a single F() counter update per ad.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=5, dedupe_ttl=3600):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedupe_ttl = dedupe_ttl
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._recent = {}
+        self._worker = None
+        self._wakeup = threading.Event()
+
+    @classmethod
+    def from_settings(cls):
+        """Build a buffer from ``settings.AD_VIEW_TRACKING``."""
+        config = {**DEFAULT_SETTINGS, **getattr(settings, "AD_VIEW_TRACKING", {})}
+        return cls(
+            batch_size=config["BATCH_SIZE"],
+            flush_interval=config["FLUSH_INTERVAL"],
+            dedupe_ttl=config["DEDUPE_TTL"],
+        )
+
+    # ========== Recording ==========
+
+    def record(self, ad_id, session_id, ip_address, user_id=None, user_agent="",
+               referrer="", device_type="unknown"):
+        """
+        Buffer a view event.
+
+        Returns False when the (ad, session) pair was already seen recently.
+        """
+        key = (ad_id, session_id)
+        now = time.monotonic()
+
+        with self._lock:
+            seen_at = self._recent.get(key)
+            if seen_at is not None and now - seen_at < self.dedupe_ttl:
+                return False
+
+            self._recent[key] = now
+            self._pending[key] = {
+                "ad_id": ad_id,
+                "session_id": session_id,
+                "user_id": user_id,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "referrer": referrer,
+                "device_type": device_type,
+            }
+            pending_count = len(self._pending)
+
+        if self.flush_interval <= 0:
+            self.flush()
+        elif pending_count >= self.batch_size:
+            self._wakeup.set()
+
+        self._ensure_worker()
+        return True
+
+    # ========== Flushing ==========
+
+    def flush(self):
+        """Write buffered events to the database. Returns the number of new views."""
+        with self._flush_lock:
+            with self._lock:
+                events = list(self._pending.values())
+                self._pending = {}
+                self._purge_recent()
+
+            if not events:
+                return 0
+
+            try:
+                return self._write(events)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(events)} ad views: {str(e)}")
+                return 0
+
+    def _write(self, events):
+        """Persist a batch of events and apply counter deltas."""
+        from .counters import AdCounterService
+        from .models import AdView
+
+        ad_ids = {event["ad_id"] for event in events}
+        sessions = {event["session_id"] for event in events}
+        ips = {event["ip_address"] for event in events}
+
+        # Sessions already recorded by an earlier flush (or another process)
+        existing = set(
+            AdView.objects.filter(ad_id__in=ad_ids, session_id__in=sessions)
+            .values_list("ad_id", "session_id")
+        )
+        # (ad, ip) pairs that already count as a unique view
+        seen_ips = set(
+            AdView.objects.filter(ad_id__in=ad_ids, ip_address__in=ips)
+            .values_list("ad_id", "ip_address")
+        )
+
+        new_views = []
+        views = Counter()
+        unique_views = Counter()
+
+        for event in events:
+            if (event["ad_id"], event["session_id"]) in existing:
+                continue
+
+            new_views.append(AdView(**event))
+            views[event["ad_id"]] += 1
+
+            ip_key = (event["ad_id"], event["ip_address"])
+            if ip_key not in seen_ips:
+                seen_ips.add(ip_key)
+                unique_views[event["ad_id"]] += 1
+
+        if not new_views:
+            return 0
+
+        with transaction.atomic():
+            AdView.objects.bulk_create(new_views, ignore_conflicts=True)
+            AdCounterService.apply_deltas(
+                {
+                    ad_id: {
+                        "view_count": count,
+                        "unique_view_count": unique_views[ad_id],
+                    }
+                    for ad_id, count in views.items()
+                }
+            )
+
+        logger.info(f"Flushed {len(new_views)} ad views for {len(views)} ads")
+        return len(new_views)
+
+    def _purge_recent(self):
+        """Forget dedupe entries older than the TTL (caller holds the lock)."""
+        cutoff = time.monotonic() - self.dedupe_ttl
+        self._recent = {
+            key: seen_at for key, seen_at in self._recent.items() if seen_at >= cutoff
+        }
+
+    # ========== Background Worker ==========
+
+    def _ensure_worker(self):
+        """Start the background flush thread on first use."""
+        if self.flush_interval <= 0 or (self._worker and self._worker.is_alive()):
+            return
+
+        with self._lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run, name="ad-view-flusher", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        """Flush periodically, or early when a batch fills up."""
+        from django.db import close_old_connections
+
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_view_buffer():
+    """Get the process-wide view buffer."""
+    global _buffer
+
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = AdViewBuffer.from_settings()
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def track_ad_view(ad, request):
+    """Queue a view of ``ad`` by the client making ``request``."""
+    from core.utils import get_client_ip, detect_device_type
+
+    ip_address = get_client_ip(request)
+    user_agent = request.META.get("HTTP_USER_AGENT", "")[:500]
+    session_id = request.session.session_key or f"anon_{ip_address}"
+
+    return get_view_buffer().record(
+        ad_id=ad.pk,
+        session_id=session_id[:50],
+        ip_address=ip_address,
+        user_id=request.user.pk if request.user.is_authenticated else None,
+        user_agent=user_agent,
+        referrer=request.META.get("HTTP_REFERER", "")[:200],
+        device_type=detect_device_type(user_agent),
+    )
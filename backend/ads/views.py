@@ -12,11 +12,15 @@ from django_filters.rest_framework import DjangoFilterBackend
 from datetime import timedelta, datetime
 import logging
 from core.simple_mixins import StateAwareViewMixin
-from core.search_mixins import SearchFilterMixin
+from core.search_mixins import SearchFilterMixin, CachedSearchMixin
 from core.pagination import SearchResultsPagination
 from .filters import PublicAdFilter, UserAdFilter
+from .search import AdSearchFilter
+from .view_tracking import track_ad_view
+from .counters import AdCounterService
+from .listing_cache import LISTING_CACHE_PREFIX, listing_scope
 
-from .models import Ad, AdImage, AdView, AdContact, AdFavorite, AdReport
+from .models import Ad, AdImage, AdContact, AdFavorite, AdReport
 from .serializers import (
     AdListSerializer,
     AdDetailSerializer,
@@ -31,23 +35,23 @@ from .serializers import (
     AdImageSerializer
 )
 from core.permissions import IsOwnerOrReadOnly
-from core.utils import get_client_ip, detect_device_type
+from core.utils import get_client_ip
 
 logger = logging.getLogger(__name__)
 
-class AdViewSet(StateAwareViewMixin, SearchFilterMixin, ModelViewSet):
+class AdViewSet(CachedSearchMixin, StateAwareViewMixin, SearchFilterMixin, ModelViewSet):
     """Main ViewSet for Ad operations with state-aware filtering and search."""
     
     # Pagination configuration
     pagination_class = SearchResultsPagination
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, AdSearchFilter, filters.OrderingFilter]
     
     # State filtering configuration
     state_field_path = 'state__code'
     allow_cross_state = True  # Allow cross-state search when requested
 
-    # Search configuration (DRF's SearchFilter)
+    # Search configuration (full-text index, icontains fallback)
     search_fields = [
         'title',
         'description',
@@ -61,6 +65,10 @@ class AdViewSet(StateAwareViewMixin, SearchFilterMixin, ModelViewSet):
     ordering_fields = ['created_at', 'title', 'price', 'view_count']
     ordering = ['-created_at']
     
+    # Response caching for public listings (invalidated via ads.listing_cache)
+    cache_prefix = LISTING_CACHE_PREFIX
+    cached_actions = ('list', 'featured', 'search')
+    
     def get_queryset(self):
         """Get queryset based on action and user with state filtering."""
         if self.action == 'my_ads':
@@ -69,15 +77,23 @@ class AdViewSet(StateAwareViewMixin, SearchFilterMixin, ModelViewSet):
                 user=self.request.user
             ).exclude(status='deleted').select_related(
                 'category', 'city', 'state', 'user'
-            ).prefetch_related('images')
+            ).prefetch_related('images', AdImage.prefetch_primary())
         
         elif self.action in ['list', 'search', 'featured']:
             # Public listing - only approved, non-expired ads with state filtering
+            # Cards only show the primary image, so skip the full image sets
             queryset = Ad.objects.active().select_related(
                 'category', 'city', 'state', 'user'
-            ).prefetch_related('images')
+            ).prefetch_related(AdImage.prefetch_primary())
+            
+            # Current state only - admins and cross-state searches see every state
+            cross_state = (
+                self.action == 'search'
+                and self.request.query_params.get('all_states') == 'true'
+            )
+            if not (self.request.user.is_staff or cross_state):
+                queryset = self.filter_by_current_state(queryset)
             
-            # State filtering is now handled by StateAwareSearchViewMixin
             # Featured ads first for list view, then by date
             if self.action == 'list':
                 queryset = queryset.order_by('-plan', '-created_at')
@@ -123,8 +139,28 @@ class AdViewSet(StateAwareViewMixin, SearchFilterMixin, ModelViewSet):
         else:
             return [AllowAny()]
     
+    def should_cache(self, request):
+        """Cross-state searches aren't covered by the per-state versions."""
+        if request.query_params.get('all_states') == 'true':
+            return False
+        return super().should_cache(request)
+    
+    def get_cache_scopes(self, request):
+        """Listings depend on the current state, narrowed to a category if filtered."""
+        category = request.query_params.get('category', '')
+        return [
+            listing_scope(
+                self.get_current_state_code(),
+                category if category.isdigit() else None
+            )
+        ]
+    
     def list(self, request, *args, **kwargs):
         """List ads - sorting handled by SearchFilterMixin."""
+        cached_response = self.get_cached_response(request)
+        if cached_response is not None:
+            return cached_response
+        
         queryset = self.filter_queryset(self.get_queryset())
         
         page = self.paginate_queryset(queryset)
@@ -154,38 +190,9 @@ class AdViewSet(StateAwareViewMixin, SearchFilterMixin, ModelViewSet):
         return Response(serializer.data)
     
     def track_view(self, ad, request):
-        """Track ad view for analytics."""
-        ip_address = get_client_ip(request)
-        user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]
-        referrer = request.META.get('HTTP_REFERER', '')
-        device_type = detect_device_type(user_agent)
-        
-        # Generate session ID for anonymous users
-        session_id = request.session.session_key or f"anon_{ip_address}"
-        
+        """Queue the view for batched ingestion (see ads.view_tracking)."""
         try:
-            # Create view record (unique constraint prevents duplicates within timeframe)
-            view, created = AdView.objects.get_or_create(
-                ad=ad,
-                session_id=session_id,
-                defaults={
-                    'user': request.user if request.user.is_authenticated else None,
-                    'ip_address': ip_address,
-                    'user_agent': user_agent,
-                    'referrer': referrer,
-                    'device_type': device_type,
-                }
-            )
-            
-            if created:
-                # Increment counters
-                is_unique = not AdView.objects.filter(
-                    ad=ad,
-                    ip_address=ip_address
-                ).exclude(id=view.id).exists()
-                
-                ad.increment_view_count(unique=is_unique)
-                
+            track_ad_view(ad, request)
         except Exception as e:
             logger.error(f"Error tracking view for ad {ad.id}: {str(e)}")
     
@@ -210,6 +217,10 @@ class AdViewSet(StateAwareViewMixin, SearchFilterMixin, ModelViewSet):
     @action(detail=False, methods=['get'])
     def search(self, request):
         """Advanced search - sorting handled by SearchFilterMixin."""
+        cached_response = self.get_cached_response(request)
+        if cached_response is not None:
+            return cached_response
+        
         queryset = self.filter_queryset(self.get_queryset())
         
         # Add state aggregation for cross-state searches
@@ -268,6 +279,10 @@ class AdViewSet(StateAwareViewMixin, SearchFilterMixin, ModelViewSet):
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """Get only featured ads - sorting handled by SearchFilterMixin."""
+        cached_response = self.get_cached_response(request)
+        if cached_response is not None:
+            return cached_response
+        
         queryset = self.filter_queryset(self.get_queryset())
         
         page = self.paginate_queryset(queryset)
@@ -411,7 +426,9 @@ class AdFavoriteViewSet(ModelViewSet):
         """Get user's favorites."""
         return AdFavorite.objects.filter(
             user=self.request.user
-        ).select_related('ad', 'ad__category', 'ad__city', 'ad__state')
+        ).select_related(
+            'ad', 'ad__category', 'ad__city', 'ad__state'
+        ).prefetch_related(AdImage.prefetch_primary('ad__images'))
     
     def create(self, request, *args, **kwargs):
         """Add ad to favorites."""
@@ -431,9 +448,7 @@ class AdFavoriteViewSet(ModelViewSet):
         )
         
         if created:
-            # Update favorite count
-            ad.favorite_count = ad.favorites.count()
-            ad.save(update_fields=['favorite_count'])
+            AdCounterService.increment(ad.id, 'favorite_count')
             
             serializer = self.get_serializer(favorite)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -453,12 +468,9 @@ class AdFavoriteViewSet(ModelViewSet):
                 ad_id=ad_id,
                 user=request.user
             )
-            ad = favorite.ad
             favorite.delete()
             
-            # Update favorite count
-            ad.favorite_count = ad.favorites.count()
-            ad.save(update_fields=['favorite_count'])
+            AdCounterService.increment(favorite.ad_id, 'favorite_count', -1)
             
             return Response({'message': 'Removed from favorites'})
             
@@ -2,6 +2,8 @@
 ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The messaging event stream (/api/messaging/events/) needs this entry point,
+e.g. ``uvicorn backend.asgi:application``; WSGI workers cannot hold it open.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -196,6 +196,9 @@ REST_FRAMEWORK = {
     ],
 }
 
+# LocMemCache is private to each process, so the versioned response caches
+# (core.search_mixins) and write-behind counters (ads.counters) stay off with
+# it; use a shared backend such as Redis in production to enable them.
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
@@ -252,6 +255,66 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@desiloginil.c
 NOTIFICATION_SETTINGS = {
     'EMAIL_NOTIFICATIONS': True,
     'IN_APP_NOTIFICATIONS': True,
+    # Emails of these types are coalesced into one digest per recipient,
+    # sent once the oldest has waited this many seconds (0 = send each)
+    'EMAIL_DIGEST_WINDOW': 3600,
+    'EMAIL_DIGEST_TYPES': [
+        'new_message',
+        'new_conversation',
+        'ad_approved',
+        'ad_rejected',
+        'ad_expired',
+        'ad_expiring_soon',
+    ],
+}
+
+# Notification email outbox (messaging.outbox) - sent by a bounded worker
+# pool per process and/or the drain_email_outbox command
+EMAIL_OUTBOX = {
+    'WORKERS': 2,  # sender threads per process, 0 = command only
+    'BATCH_SIZE': 50,  # emails per SMTP connection
+    'MAX_ATTEMPTS': 5,  # then the email is dead-lettered
+    'RETRY_BACKOFF': 60,  # seconds before the first retry, doubled each attempt
+}
+
+# Live message/notification push (messaging.events), served under ASGI
+MESSAGING_EVENTS = {
+    'BROKER': 'messaging.events.LocalEventBroker',  # process-local; swap for multi-worker
+    'KEEPALIVE': 15,  # seconds between keep-alive comments
+    'MAX_DURATION': 300,  # seconds before the stream closes and the client reconnects
+    'TICKET_TTL': 30,  # seconds an EventSource ticket (events/ticket/) stays valid
+}
+
+# Ad view ingestion - views are buffered in memory and written in batches
+AD_VIEW_TRACKING = {
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 5,  # seconds, 0 writes each view inline
+    'DEDUPE_TTL': 3600,  # seconds a session is remembered per ad
+}
+
+# Write-behind ad counters (views, contacts, favorites) - see ads.counters.
+# Deltas are only buffered in a cache shared by every process (e.g. Redis);
+# with the LocMemCache above each increment is written inline.
+AD_COUNTERS = {
+    'FLUSH_INTERVAL': 10,  # seconds, 0 writes each increment inline
+    'CACHE_ALIAS': 'default',  # point at a dedicated non-evicting cache in production
+}
+
+# Ad expiry sweeps (ads.expiry) - run sweep_expired_ads from cron
+AD_EXPIRY = {
+    'CHUNK_SIZE': 500,  # ads moved per UPDATE
+    'WARN_DAYS': 3,  # warn owners this many days before expiry, 0 = never
+}
+
+# Ad image pipeline (ads.images) - run process_ad_images to backfill
+AD_IMAGES = {
+    'WORKERS': 2,  # processing threads per process, 0 = process inline after commit
+    'VARIANTS': {  # name -> bounding box, aspect ratio is kept
+        'thumb': (400, 300),
+        'medium': (1024, 768),
+    },
+    'JPEG_QUALITY': 82,
+    'WEBP_QUALITY': 80,
 }
 
 # Google OAuth settings
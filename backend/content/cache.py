@@ -0,0 +1,9 @@
+# content/cache.py
+from core.cache_versions import bump_version
+
+CONTENT_CACHE_PREFIX = "content"
+
+
+def bump_content_versions(*scopes):
+    """Invalidate cached content responses built from ``scopes`` (e.g. "city")."""
+    bump_version(*[f"{CONTENT_CACHE_PREFIX}:{scope}" for scope in scopes])
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_category_counts(apps, schema_editor):
+    Ad = apps.get_model('ads', 'Ad')
+    CategoryStateCount = apps.get_model('content', 'CategoryStateCount')
+
+    counts = (
+        Ad.objects.filter(status='approved')
+        .order_by()
+        .values('state_id', 'category_id')
+        .annotate(total=models.Count('id'))
+    )
+    CategoryStateCount.objects.bulk_create(
+        [
+            CategoryStateCount(
+                state_id=row['state_id'], category_id=row['category_id'], active_ads=row['total']
+            )
+            for row in counts
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0006_ad_image_variants'),
+        ('content', '0002_city_photo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStateCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('active_ads', models.PositiveIntegerField(default=0, verbose_name='Active Ads')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='state_counts', to='content.category', verbose_name='Category')),
+                ('state', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_counts', to='content.state', verbose_name='State')),
+            ],
+            options={
+                'verbose_name': 'Category State Count',
+                'verbose_name_plural': 'Category State Counts',
+                'unique_together': {('state', 'category')},
+            },
+        ),
+        migrations.RunPython(backfill_category_counts, migrations.RunPython.noop),
+    ]
@@ -208,10 +208,38 @@ class Category(models.Model):
     
     def get_active_ads_count(self):
         """Get count of active ads in this category."""
-        from ads.models import Ad
-        from django.utils import timezone
-        
-        return self.ads.filter(
-            status='approved',
-            expires_at__gt=timezone.now()
-        ).count()
\ No newline at end of file
+        # Summed from the per-state counts kept by ads.category_counts
+        total = self.state_counts.aggregate(total=models.Sum('active_ads'))['total']
+        return total or 0
+
+
+class CategoryStateCount(models.Model):
+    """
+    Number of approved ads per state and category.
+    
+    Maintained incrementally by ads.category_counts as ads change status,
+    move or expire, and rebuilt by the reconcile_category_counts command.
+    """
+    
+    state = models.ForeignKey(
+        State,
+        on_delete=models.CASCADE,
+        related_name='category_counts',
+        verbose_name=_('State')
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='state_counts',
+        verbose_name=_('Category')
+    )
+    active_ads = models.PositiveIntegerField(_('Active Ads'), default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = _('Category State Count')
+        verbose_name_plural = _('Category State Counts')
+        unique_together = ['state', 'category']
+    
+    def __str__(self):
+        return f"{self.category} in {self.state.code}: {self.active_ads}"
\ No newline at end of file
@@ -0,0 +1,30 @@
+# content/signals.py
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.middleware import state_resolver
+from .cache import bump_content_versions
+from .models import State, City, Category
+
+
+@receiver(post_save, sender=State)
+@receiver(post_delete, sender=State)
+def invalidate_state_domains(sender, instance, **kwargs):
+    """Refresh domain routing and the cached state context when a state changes."""
+    state_resolver.invalidate()
+    cache.delete(f'state_context_{instance.code}')
+    bump_content_versions('state')
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def invalidate_city_lists(sender, instance, **kwargs):
+    """Drop cached city lists when a city changes."""
+    bump_content_versions('city')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_lists(sender, instance, **kwargs):
+    """Drop cached category lists when a category changes."""
+    bump_content_versions('category')
@@ -1,3 +1,53 @@
-from django.test import TestCase
+import tempfile
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .models import City, State
+
+SHARED_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": tempfile.mkdtemp(),
+    }
+}
+
+
+class ContentResponseCacheTests(TestCase):
+    """Content lists are cached only in a shared cache, and edits invalidate them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.state = State.objects.create(
+            code="IL",
+            name="Illinois",
+            domain="desiloginil.com",
+            meta_title="IL",
+            meta_description="IL",
+            logo="logo.png",
+        )
+        City.objects.create(name="Chicago", state=cls.state)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_not_cached_in_process_local_cache(self):
+        self.client.get("/api/content/cities/simple/")
+        response = self.client.get("/api/content/cities/simple/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Cache", response)
+
+    @override_settings(CACHES=SHARED_CACHE)
+    def test_city_change_invalidates_shared_cache(self):
+        cache.clear()
+        self.assertEqual(self.client.get("/api/content/cities/simple/")["X-Cache"], "MISS")
+        self.assertEqual(self.client.get("/api/content/cities/simple/")["X-Cache"], "HIT")
+
+        City.objects.create(name="Naperville", state=self.state)
+
+        response = self.client.get("/api/content/cities/simple/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.json()["results"]), 2)
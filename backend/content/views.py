@@ -2,11 +2,14 @@ from rest_framework import generics, filters
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Q
-from django.utils import timezone
-from core.simple_mixins import StateAwareViewMixin
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from core.simple_mixins import StateAwareViewMixin, SimpleStateContextMixin
+from core.search_mixins import CachedResponseMixin
 from core.pagination import StandardResultsSetPagination
-from .models import State, City, Category
+from ads.listing_cache import listing_scope
+from .cache import CONTENT_CACHE_PREFIX
+from .models import State, City, Category, CategoryStateCount
 from .serializers import (
     StateSerializer, 
     CitySerializer,
@@ -46,7 +49,7 @@ class StateByDomainView(generics.RetrieveAPIView):
         return State.objects.get(code=state_code, is_active=True)
 
 # City Views
-class CityListView(StateAwareViewMixin, generics.ListAPIView):
+class CityListView(CachedResponseMixin, StateAwareViewMixin, generics.ListAPIView):
     """List cities with filtering options - automatically filtered by current state."""
     
     queryset = City.objects.filter(is_active=True).select_related('state')
@@ -63,8 +66,10 @@ class CityListView(StateAwareViewMixin, generics.ListAPIView):
     state_field_path = 'state__code'
     allow_cross_state = True  # Allow ?all_states=true for admin use
     cache_timeout = 1800  # 30 minutes cache
+    cache_prefix = CONTENT_CACHE_PREFIX
+    cache_scopes = ('city', 'state')
 
-class CitySimpleListView(StateAwareViewMixin, generics.ListAPIView):
+class CitySimpleListView(CachedResponseMixin, StateAwareViewMixin, generics.ListAPIView):
     """Simple list of cities for dropdowns - automatically filtered by current state."""
     
     queryset = City.objects.filter(is_active=True).select_related('state')
@@ -74,10 +79,12 @@ class CitySimpleListView(StateAwareViewMixin, generics.ListAPIView):
     # State filtering configuration
     state_field_path = 'state__code'
     cache_timeout = 3600  # 1 hour cache for simple lists
+    cache_prefix = CONTENT_CACHE_PREFIX
+    cache_scopes = ('city', 'state')
 
 
 # Category Views
-class CategoryListView(StateAwareViewMixin, generics.ListAPIView):
+class CategoryListView(CachedResponseMixin, StateAwareViewMixin, generics.ListAPIView):
     """List all active categories with state-specific ad counts."""
     
     serializer_class = CategorySerializer
@@ -88,20 +95,26 @@ class CategoryListView(StateAwareViewMixin, generics.ListAPIView):
     ordering_fields = ['name', 'sort_order', 'created_at']
     ordering = ['sort_order', 'name']
     cache_timeout = 1800  # 30 minutes cache
+    cache_prefix = CONTENT_CACHE_PREFIX
+    cache_scopes = ('category',)
+    
+    def get_cache_scopes(self, request):
+        """The ad counts also go stale when the state's listings change."""
+        state_code = getattr(request, 'state_code', 'IL')
+        return super().get_cache_scopes(request) + [listing_scope(state_code)]
     
     def get_queryset(self):
         """Get categories with state-specific ad counts."""
         state_code = getattr(self.request, 'state_code', 'IL')
         
+        # Precomputed per (state, category) by ads.category_counts
+        counts = CategoryStateCount.objects.filter(
+            category=OuterRef('pk'),
+            state__code__iexact=state_code,
+        ).values('active_ads')[:1]
+        
         return Category.objects.filter(is_active=True).annotate(
-            state_ads_count=Count(
-                'ads',
-                filter=Q(
-                    ads__status='approved',
-                    ads__state__code__iexact=state_code,
-                    ads__expires_at__gt=timezone.now()
-                )
-            )
+            state_ads_count=Coalesce(Subquery(counts), 0)
         )
 
 class CategoryDetailView(generics.RetrieveAPIView):
@@ -112,11 +125,13 @@ class CategoryDetailView(generics.RetrieveAPIView):
     permission_classes = [AllowAny]
     lookup_field = 'slug'
 
-class CategorySimpleListView(StateAwareViewMixin, generics.ListAPIView):
-    """Simple list of categories for dropdowns."""
+class CategorySimpleListView(CachedResponseMixin, SimpleStateContextMixin, generics.ListAPIView):
+    """Simple list of categories for dropdowns (categories are shared by all states)."""
     
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySimpleSerializer
     permission_classes = [AllowAny]
     ordering = ['sort_order', 'name']
     cache_timeout = 3600  # 1 hour cache for simple lists
+    cache_prefix = CONTENT_CACHE_PREFIX
+    cache_scopes = ('category',)
@@ -0,0 +1,61 @@
+# core/cache_versions.py
+import time
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Version keys never expire on their own; entries keyed on them do.
+VERSION_KEY_PREFIX = "cache_version"
+
+# Backends private to one process: a version bumped in one worker is never
+# seen by the others, so nothing may be cached against these versions there
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared_cache(alias="default"):
+    """Whether every process sees the same ``alias`` cache (Redis, Memcached)."""
+    return not isinstance(caches[alias], PROCESS_LOCAL_BACKENDS)
+
+
+def _key(scope):
+    return f"{VERSION_KEY_PREFIX}:{scope}"
+
+
+def _initial_version():
+    # A scope whose key was evicted must not restart at a version that
+    # entries still in the cache were stored under; microseconds since the
+    # epoch stay above any earlier seed plus the bumps made since
+    return time.time_ns() // 1000
+
+
+def get_versions(scopes):
+    """Get the current version of each scope (one cache round trip)."""
+    keys = [_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            initial = _initial_version()
+            cache.add(key, initial, timeout=None)
+            version = cache.get(key, initial)
+        versions.append(version)
+    return versions
+
+
+def get_version(scope):
+    """Get the current version of a single scope."""
+    return get_versions([scope])[0]
+
+
+def bump_version(*scopes):
+    """Invalidate everything cached under ``scopes``."""
+    for scope in scopes:
+        key = _key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Unknown (or evicted) scope - start above any version in use
+            if not cache.add(key, _initial_version(), timeout=None):
+                cache.incr(key)
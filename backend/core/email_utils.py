@@ -1,12 +1,106 @@
 import logging
-from typing import List, Dict, Any, Optional
+import re
+import threading
+import weakref
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.template import Context
+from django.template.loader import get_template
 from django.conf import settings
 from django.utils.html import strip_tags
 
 logger = logging.getLogger(__name__)
 
+
+class EmailTemplateCache:
+    """
+    Compiled email templates plus a derived plain-text template for each.
+    
+    The text alternative used to be produced by running ``strip_tags`` over
+    every rendered email. Instead, the HTML template *source* is converted
+    to a text template once (tags stripped, links kept as "text (url)",
+    ``{{ }}``/``{% %}`` left intact) and rendered with autoescaping off, so
+    each email costs two template renders and no HTML parsing. Compiled
+    templates come from Django's cached loader; derived text templates are
+    keyed weakly on them, so template reloads in development drop them too.
+    """
+    
+    _lock = threading.Lock()
+    _text_templates = weakref.WeakKeyDictionary()
+    
+    _DROP_BLOCKS = re.compile(r'<(head|style|script)\b.*?</\1\s*>', re.I | re.S)
+    _LINKS = re.compile(r'<a\b[^>]*?href="([^"]*)"[^>]*>(.*?)</a\s*>', re.I | re.S)
+    _BREAKS = re.compile(r'<br\s*/?>|</(p|div|h[1-6]|li|tr)\s*>', re.I)
+    _BLANK_LINES = re.compile(r'\n\s*\n(\s*\n)+')
+    
+    @classmethod
+    def get(cls, template_name: str):
+        """Get the compiled (html, text) engine templates for ``emails/<template_name>.html``."""
+        html_template = get_template(f'emails/{template_name}.html').template
+        
+        text_template = cls._text_templates.get(html_template)
+        if text_template is None:
+            with cls._lock:
+                text_template = cls._text_templates.get(html_template)
+                if text_template is None:
+                    text_template = cls._build_text_template(html_template)
+                    cls._text_templates[html_template] = text_template
+        return html_template, text_template
+    
+    @classmethod
+    def _build_text_template(cls, html_template):
+        """Derive a plain-text template from an HTML template's source."""
+        source = html_template.source
+        if '{% extends' in source or '{% include' in source:
+            # Inherited markup isn't visible in this source - strip per email
+            return None
+        
+        source = cls._DROP_BLOCKS.sub('', source)
+        source = cls._LINKS.sub(lambda m: f'{m.group(2).strip()} ({m.group(1)})', source)
+        source = cls._BREAKS.sub('\n', source)
+        source = strip_tags(source)
+        source = '\n'.join(line.strip() for line in source.splitlines())
+        
+        return html_template.engine.from_string(
+            '{% autoescape off %}' + source.strip() + '{% endautoescape %}'
+        )
+    
+    @classmethod
+    def render(cls, template_name: str, context: Dict[str, Any]) -> Tuple[str, str]:
+        """Render one email; returns (html, text)."""
+        return next(cls.render_many(template_name, [context]))
+    
+    @classmethod
+    def render_many(
+        cls,
+        template_name: str,
+        contexts: Iterable[Dict[str, Any]],
+        shared_context: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Render a batch of emails from one template; yields (html, text).
+        
+        The templates are looked up once and ``shared_context`` is built into
+        a single Context that each email's own variables are pushed onto.
+        """
+        html_template, text_template = cls.get(template_name)
+        context = Context(shared_context or {})
+        
+        for email_context in contexts:
+            with context.push(email_context):
+                html = html_template.render(context)
+                if text_template is not None:
+                    text = cls._BLANK_LINES.sub('\n\n', text_template.render(context))
+                else:
+                    text = strip_tags(html)
+            yield html, text
+    
+    @classmethod
+    def clear(cls):
+        """Forget derived text templates."""
+        with cls._lock:
+            cls._text_templates.clear()
+
 class EmailService:
     """Centralized email service for sending emails using HTML templates."""
     
@@ -33,6 +127,87 @@ class EmailService:
         
         return True
     
+    @staticmethod
+    def build_email(
+        subject: str,
+        recipient_list: List[str],
+        template_name: str,
+        context: Dict[str, Any],
+        from_email: Optional[str] = None,
+        connection=None
+    ) -> EmailMultiAlternatives:
+        """
+        Render a template into an unsent HTML + text email.
+        
+        Pass ``connection`` (from ``django.core.mail.get_connection``) to send
+        several messages over one SMTP session.
+        
+        Raises:
+            Exception: If the template cannot be rendered
+        """
+        # Set default from_email
+        if not from_email:
+            from_email = settings.DEFAULT_FROM_EMAIL
+        
+        # Render HTML and text versions from the cached templates
+        try:
+            html_message, text_message = EmailTemplateCache.render(template_name, context)
+        except Exception as e:
+            logger.error(f"Failed to render template emails/{template_name}.html: {e}")
+            raise Exception(f"Template not found: emails/{template_name}.html")
+        
+        # Email with both HTML and text versions
+        msg = EmailMultiAlternatives(
+            subject=subject,
+            body=text_message,
+            from_email=from_email,
+            to=recipient_list,
+            connection=connection
+        )
+        msg.attach_alternative(html_message, "text/html")
+        return msg
+
+    @staticmethod
+    def build_emails(
+        template_name: str,
+        emails: List[Dict[str, Any]],
+        from_email: Optional[str] = None,
+        connection=None
+    ) -> List[EmailMultiAlternatives]:
+        """
+        Render several unsent emails from one template.
+
+        Each item of ``emails`` holds ``subject``, ``recipient_list`` and
+        ``context``. The template is looked up once for the whole batch
+        (``EmailTemplateCache.render_many``).
+
+        Raises:
+            Exception: If any email cannot be rendered
+        """
+        if not from_email:
+            from_email = settings.DEFAULT_FROM_EMAIL
+
+        try:
+            rendered = list(EmailTemplateCache.render_many(
+                template_name, [email['context'] for email in emails]
+            ))
+        except Exception as e:
+            logger.error(f"Failed to render template emails/{template_name}.html: {e}")
+            raise Exception(f"Template not found: emails/{template_name}.html")
+
+        messages = []
+        for email, (html_message, text_message) in zip(emails, rendered):
+            msg = EmailMultiAlternatives(
+                subject=email['subject'],
+                body=text_message,
+                from_email=from_email,
+                to=email['recipient_list'],
+                connection=connection
+            )
+            msg.attach_alternative(html_message, "text/html")
+            messages.append(msg)
+        return messages
+
     @staticmethod
     def send_email(
         subject: str,
@@ -63,30 +238,9 @@ class EmailService:
                     raise Exception("Email configuration is incomplete")
                 return False
             
-            # Set default from_email
-            if not from_email:
-                from_email = settings.DEFAULT_FROM_EMAIL
-            
-            # Render HTML template
-            try:
-                html_message = render_to_string(f'emails/{template_name}.html', context)
-            except Exception as e:
-                logger.error(f"Failed to render template emails/{template_name}.html: {e}")
-                if not fail_silently:
-                    raise Exception(f"Template not found: emails/{template_name}.html")
-                return False
-            
-            # Generate text version by stripping HTML tags
-            text_message = strip_tags(html_message)
-            
-            # Send email with both HTML and text versions
-            msg = EmailMultiAlternatives(
-                subject=subject,
-                body=text_message,
-                from_email=from_email,
-                to=recipient_list
+            msg = EmailService.build_email(
+                subject, recipient_list, template_name, context, from_email
             )
-            msg.attach_alternative(html_message, "text/html")
             msg.send(fail_silently=fail_silently)
             
             logger.info(f"Email sent successfully to {recipient_list}")
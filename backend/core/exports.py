@@ -0,0 +1,111 @@
+# core/exports.py
+import csv
+import io
+import zlib
+from datetime import datetime, time, timedelta
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+# Flush buffered CSV text to the client once it grows past this many characters
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_EXPORT_DAYS = 30
+MAX_EXPORT_DAYS = 3660  # about ten years
+
+
+def iter_csv(header, rows):
+    """Yield CSV text for ``header`` and ``rows`` in chunks of about CHUNK_SIZE."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_gzip(chunks):
+    """Gzip-compress a stream of text chunks incrementally."""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_csv(request, filename, header, rows):
+    """
+    Build a StreamingHttpResponse for a CSV export.
+
+    ``rows`` should be a lazy iterable (e.g. ``queryset.iterator()``) so
+    memory stays constant. Pass ``?compress=gzip`` to get a .csv.gz file.
+    """
+    chunks = iter_csv(header, rows)
+
+    if request.query_params.get("compress") == "gzip":
+        response = StreamingHttpResponse(iter_gzip(chunks), content_type="application/gzip")
+        filename = f"{filename}.gz"
+    else:
+        response = StreamingHttpResponse(chunks, content_type="text/csv")
+
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def get_export_filters(request):
+    """
+    Parse the optional export filters from the query string.
+
+    Returns a dict with ``date_from``/``date_to`` (aware datetimes bounding
+    whole days, or None), ``state`` and ``status`` (strings, or None) and
+    ``days`` (the period length for exports without a date_from, 1-3660,
+    default 30).
+    """
+    params = request.query_params
+    filters = {"date_from": None, "date_to": None}
+
+    for name in ("date_from", "date_to"):
+        value = params.get(name)
+        if not value:
+            continue
+        try:
+            day = parse_date(value)
+        except ValueError:  # well formed but impossible, e.g. 2024-02-30
+            day = None
+        if day is None:
+            raise ValidationError({name: "Enter a valid date in the YYYY-MM-DD format."})
+        if name == "date_to":
+            day += timedelta(days=1)  # inclusive
+        filters[name] = timezone.make_aware(datetime.combine(day, time.min))
+
+    try:
+        filters["days"] = int(params.get("days", DEFAULT_EXPORT_DAYS))
+    except (TypeError, ValueError):
+        filters["days"] = None
+    if filters["days"] is None or not 1 <= filters["days"] <= MAX_EXPORT_DAYS:
+        raise ValidationError({"days": f"Enter a whole number from 1 to {MAX_EXPORT_DAYS}."})
+
+    state = params.get("state")
+    filters["state"] = state if state and state != "all" else None
+    status = params.get("status")
+    filters["status"] = status if status and status != "all" else None
+
+    return filters
+
+
+def filter_by_date(queryset, filters, field="created_at"):
+    """Apply the date_from/date_to export filters to ``field``."""
+    if filters["date_from"]:
+        queryset = queryset.filter(**{f"{field}__gte": filters["date_from"]})
+    if filters["date_to"]:
+        queryset = queryset.filter(**{f"{field}__lt": filters["date_to"]})
+    return queryset
@@ -1,11 +1,142 @@
 # core/middleware.py
+import threading
+import time
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.exceptions import DisallowedHost
+from django.db import DatabaseError
+from django.http.request import split_domain_port
 from django.utils.deprecation import MiddlewareMixin
+from .cache_versions import bump_version, get_version
+
+DEFAULT_STATE_CODE = 'IL'
+
+# Version scope bumped whenever a State changes (see content.signals)
+STATE_DOMAINS_SCOPE = 'state_domains'
+
+
+class StateDomainResolver:
+    """
+    Process-local host -> state code resolver.
+
+    The domain map is built from ``settings.STATE_DOMAIN_MAPPING`` overlaid
+    with active ``State.domain`` values, and resolved hosts are memoized, so
+    a warm process answers from memory. Other processes notice changes
+    through a cache version checked at most every ``check_interval`` seconds.
+    """
+
+    check_interval = 5  # seconds
+    max_memoized_hosts = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._domains = None
+        self._hosts = {}
+        self._version = None
+        self._checked_at = 0
+
+    def invalidate(self):
+        """Drop the domain map in this process and signal other processes."""
+        with self._lock:
+            self._domains = None
+            self._hosts = {}
+        bump_version(STATE_DOMAINS_SCOPE)
+
+    def get_domains(self):
+        """Get the {domain: state_code} map, rebuilding it when stale."""
+        now = time.monotonic()
+        if self._domains is not None and now - self._checked_at < self.check_interval:
+            return self._domains
+
+        version = get_version(STATE_DOMAINS_SCOPE)
+        with self._lock:
+            if self._domains is None or version != self._version:
+                self._domains = self._load_domains()
+                self._hosts = {}
+                self._version = version
+            self._checked_at = now
+            return self._domains
+
+    @staticmethod
+    def _load_domains():
+        from content.models import State
+
+        domains = {
+            domain.lower(): code.upper()
+            for domain, code in getattr(settings, 'STATE_DOMAIN_MAPPING', {}).items()
+        }
+        try:
+            states = list(State.objects.filter(is_active=True).values_list('domain', 'code'))
+        except DatabaseError:
+            # Tables not migrated yet - settings mapping only
+            states = []
+
+        for domain, code in states:
+            if domain:
+                domains[domain.lower()] = code.upper()
+        return domains
+
+    def resolve(self, host):
+        """Get the state code for ``host`` (port and subdomains ignored), or None."""
+        if not host:
+            return None
+
+        domains = self.get_domains()
+        host, _ = split_domain_port(host)
+
+        if host in self._hosts:
+            return self._hosts[host]
+
+        code = domains.get(host)
+        if code is None:
+            # api.desilogintx.com, www.desiloginil.com, ...
+            parts = host.split('.')
+            for index in range(1, len(parts) - 1):
+                code = domains.get('.'.join(parts[index:]))
+                if code:
+                    break
+
+        if len(self._hosts) >= self.max_memoized_hosts:
+            self._hosts = {}
+        self._hosts[host] = code
+        return code
+
+
+state_resolver = StateDomainResolver()
 
 
 class StateMiddleware(MiddlewareMixin):
-    """Middleware to handle state-based functionality."""
-    
+    """
+    Middleware to resolve the current state from the request domain.
+
+    Sets ``request.state_code`` from the Origin of cross-origin frontend
+    calls (the API may live on a shared host), then the Host header, then
+    the Referer, and finally ``DEFAULT_STATE_CODE``.
+    """
+
     def process_request(self, request):
-        # This middleware can be used for state-specific logic
-        # For now, it's a placeholder
+        request.state_code = self.get_state_code(request)
         return None
+
+    def get_state_code(self, request):
+        """Resolve the state code for a request."""
+        origin = request.META.get('HTTP_ORIGIN')
+        if origin:
+            code = state_resolver.resolve(urlsplit(origin).netloc)
+            if code:
+                return code
+
+        try:
+            code = state_resolver.resolve(request.get_host())
+        except DisallowedHost:
+            code = None
+        if code:
+            return code
+
+        referer = request.META.get('HTTP_REFERER')
+        if referer:
+            code = state_resolver.resolve(urlsplit(referer).netloc)
+            if code:
+                return code
+
+        return getattr(settings, 'DEFAULT_STATE_CODE', DEFAULT_STATE_CODE)
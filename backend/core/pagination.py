@@ -1,18 +1,228 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import datetime
+import hashlib
+import json
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-class StandardResultsSetPagination(PageNumberPagination):
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """Keep full microsecond precision so cursors compare exactly."""
+    
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset ("cursor") pagination for infinite-scroll clients.
+
+    Pages are fetched with ``WHERE (ordering) > (last row)`` instead of
+    OFFSET, and the total comes from a short-lived cached COUNT, so every
+    page costs the same regardless of depth. The queryset ordering must be
+    made of non-nullable model fields; the primary key is appended as a
+    tie-breaker. Only forward navigation is supported.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_cache_timeout = 60  # seconds
+    
+    @classmethod
+    def requested(cls, request):
+        """Check whether the client asked for cursor pagination."""
+        params = request.query_params
+        return params.get('pagination') == 'cursor' or cls.cursor_query_param in params
+    
+    @staticmethod
+    def get_ordering(queryset):
+        """
+        Get the ordering as [(field, descending)] with a pk tie-breaker.
+        
+        Returns None when the ordering can't be used as a keyset.
+        """
+        model = queryset.model
+        ordering = list(queryset.query.order_by or model._meta.ordering)
+        if not ordering:
+            ordering = ['pk']
+        
+        keys = []
+        for item in ordering:
+            if not isinstance(item, str) or item == '?':
+                return None
+            descending = item.startswith('-')
+            name = item.lstrip('-')
+            if name == 'pk':
+                name = model._meta.pk.name
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.null or field.is_relation:
+                return None
+            keys.append((field, descending))
+        
+        if keys[-1][0] != model._meta.pk:
+            keys.append((model._meta.pk, keys[-1][1]))
+        
+        return keys
+    
+    @classmethod
+    def supports(cls, queryset):
+        """Check whether ``queryset`` can be keyset-paginated."""
+        return cls.get_ordering(queryset) is not None
+    
+    def get_page_size(self, request):
+        """Get the page size from the request, capped at ``max_page_size``."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = self.get_ordering(queryset)
+        if ordering is None:
+            raise NotFound('This ordering does not support cursor pagination.')
+        
+        queryset = queryset.order_by(
+            *[f"{'-' if descending else ''}{field.name}" for field, descending in ordering]
+        )
+        self.count = self.get_count(queryset)
+        
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self.after(ordering, self.decode_cursor(encoded, ordering)))
+        
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        
+        self.next_cursor = None
+        if self.has_next and rows:
+            last = rows[-1]
+            self.next_cursor = self.encode_cursor(
+                [field.value_from_object(last) for field, _ in ordering]
+            )
+        
+        return rows
+    
+    @staticmethod
+    def after(ordering, values):
+        """Build the filter selecting rows strictly after ``values``."""
+        condition = Q()
+        for index, (field, descending) in enumerate(ordering):
+            lookup = 'lt' if descending else 'gt'
+            term = Q(**{f'{field.attname}__{lookup}': values[index]})
+            for previous_field, previous_value in zip(ordering[:index], values):
+                term &= Q(**{previous_field[0].attname: previous_value})
+            condition |= term
+        return condition
+    
+    @staticmethod
+    def encode_cursor(values):
+        """Serialize row values into an opaque cursor token."""
+        payload = json.dumps(values, cls=CursorJSONEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(encoded, ordering):
+        """Parse a cursor token back into field values."""
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            if not isinstance(values, list) or len(values) != len(ordering):
+                raise ValueError
+            return [field.to_python(value) for (field, _), value in zip(ordering, values)]
+        except (ValueError, TypeError, ValidationError, UnicodeDecodeError):
+            raise NotFound('Invalid cursor.')
+    
+    def get_count(self, queryset):
+        """
+        Total result count, cached briefly per client-visible query.
+        
+        Keyed on the request (host, path, user and params minus the cursor)
+        rather than the SQL, which embeds ``now()`` for active-ad filters.
+        """
+        request = self.request
+        params = sorted(
+            (key, value)
+            for key, value in request.query_params.items()
+            if key != self.cursor_query_param
+        )
+        user = request.user.pk if request.user.is_authenticated else 'anon'
+        raw = f'{request.get_host()}|{request.path}|{user}|{params!r}'
+        cache_key = f'keyset_count:{hashlib.md5(raw.encode()).hexdigest()}'
+        
+        count = cache.get(cache_key)
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(cache_key, count, self.count_cache_timeout)
+        return count
+    
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+    
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': None,
+            'next_cursor': self.next_cursor,
+            'results': data
+        })
+
+
+class KeysetOptInMixin:
+    """
+    Let page-number paginators switch to KeysetPagination when the client
+    sends ``?pagination=cursor`` (or a ``cursor``). Orderings keyset can't
+    handle (e.g. nullable price) keep using page numbers.
+    """
+    
+    keyset = None
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if KeysetPagination.requested(request) and KeysetPagination.supports(queryset):
+            self.keyset = KeysetPagination()
+            self.keyset.page_size = self.page_size
+            self.keyset.max_page_size = self.max_page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+    
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class StandardResultsSetPagination(KeysetOptInMixin, PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class LargeResultsSetPagination(PageNumberPagination):
+class LargeResultsSetPagination(KeysetOptInMixin, PageNumberPagination):
     page_size = 50
     page_size_query_param = 'page_size'
     max_page_size = 200
 
 
-class SearchResultsPagination(PageNumberPagination):
+class SearchResultsPagination(KeysetOptInMixin, PageNumberPagination):
     """Pagination for search results."""
     page_size = 20
     page_size_query_param = 'page_size'
@@ -20,6 +230,9 @@ class SearchResultsPagination(PageNumberPagination):
     
     def get_paginated_response(self, data):
         """Custom response format."""
+        if self.keyset is not None:
+            return super().get_paginated_response(data)
+        
         return Response({
             'count': self.page.paginator.count,
             'next': self.get_next_link(),
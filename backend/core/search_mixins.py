@@ -1,6 +1,11 @@
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
 from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.response import Response
+from urllib.parse import urlencode
+import hashlib
+from .cache_versions import get_versions, is_shared_cache
 
 
 class SearchFilterMixin:
@@ -34,11 +39,21 @@ class SearchFilterMixin:
                 'price_high': '-price',
                 'views': '-view_count',
                 'relevance': '-rank',
+                # 'featured' sorts before 'free'
+                'featured': ('plan', '-created_at'),
             }
             
             order_by = sort_mapping.get(sort_by)
+            
+            # Relevance needs a rank annotation from a full-text search
+            if order_by == '-rank' and 'rank' not in queryset.query.annotations:
+                order_by = '-created_at'
+            
+            if isinstance(order_by, str):
+                order_by = (order_by,)
+            
             if order_by:
-                queryset = queryset.order_by(order_by)
+                queryset = queryset.order_by(*order_by)
         
         return queryset
 
@@ -65,27 +80,122 @@ class StateAwareSearchMixin(SearchFilterMixin):
 
 
 class CachedSearchMixin:
-    """Mixin to add caching to search results."""
+    """
+    Mixin to cache rendered list responses.
+
+    Views call ``get_cached_response(request)`` at the top of a cacheable
+    action and return it when not None; the rendered JSON is stored in
+    ``finalize_response``. Keys include the action, the current state, the
+    (normalized) query params including ``page``, the user for authenticated
+    requests and the versions of ``get_cache_scopes()`` - bump a scope with
+    ``core.cache_versions.bump_version`` to invalidate its entries.
+
+    Nothing is cached unless the default cache is shared by every process:
+    with a per-process backend (LocMemCache) a bump in one worker would leave
+    the other workers serving stale pages until the timeout.
+    """
     
     cache_timeout = 300  # 5 minutes
+    cache_prefix = 'ad_search'
+    cached_actions = ('list',)
+    cache_per_user = True  # Responses that differ per user (e.g. is_owner)
+    
+    def get_cache_action(self):
+        """Name of the action being served, as used in keys and ``cached_actions``."""
+        return self.action
+    
+    def get_cache_scopes(self, request):
+        """Version scopes the cached responses depend on."""
+        return [self.cache_prefix]
+    
+    def should_cache(self, request):
+        """Only anonymous/regular GETs of cacheable actions rendered as JSON."""
+        if request.method != 'GET' or self.get_cache_action() not in self.cached_actions:
+            return False
+        if not is_shared_cache():
+            return False
+        if request.user.is_authenticated and request.user.is_staff:
+            return False
+        renderer = getattr(request, 'accepted_renderer', None)
+        return renderer is None or renderer.format == 'json'
+    
+    def get_cache_key(self, request):
+        """Generate cache key from request params, state, user and versions."""
+        params = sorted(
+            (key, ','.join(sorted(v for v in values if v != '')))
+            for key, values in request.query_params.lists()
+        )
+        query = urlencode([(key, value) for key, value in params if value])
+        
+        state_code = getattr(request, 'state_code', 'IL') or 'IL'
+        user = 'anon'
+        if self.cache_per_user and request.user.is_authenticated:
+            user = request.user.pk
+        versions = '.'.join(
+            str(version) for version in get_versions(self.get_cache_scopes(request))
+        )
+        digest = hashlib.md5(query.encode()).hexdigest()
+        
+        return f"{self.cache_prefix}:{self.get_cache_action()}:{state_code.upper()}:{user}:{versions}:{digest}"
     
-    def list(self, request, *args, **kwargs):
-        """Cache list results."""
+    def get_cached_response(self, request):
+        """Return the cached response for this request, or None on a miss."""
+        self._response_cache_key = None
+        if not self.should_cache(request):
+            return None
+        
         cache_key = self.get_cache_key(request)
+        content = cache.get(cache_key)
+        if content is not None:
+            response = HttpResponse(content, content_type='application/json')
+            response['X-Cache'] = 'HIT'
+            return response
         
-        cached_response = cache.get(cache_key)
-        if cached_response is not None:
-            return cached_response
+        self._response_cache_key = cache_key
+        return None
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Store successful responses for requests that missed the cache."""
+        response = super().finalize_response(request, response, *args, **kwargs)
         
-        response = super().list(request, *args, **kwargs)
-        cache.set(cache_key, response, self.cache_timeout)
+        cache_key = getattr(self, '_response_cache_key', None)
+        if cache_key and isinstance(response, Response) and response.status_code == 200:
+            response.render()
+            cache.set(cache_key, response.content, self.cache_timeout)
+            response['X-Cache'] = 'MISS'
         
         return response
+
+
+class CachedResponseMixin(CachedSearchMixin):
+    """
+    Response cache for generic (non-ViewSet) public GET views.
+
+    Honours the view's ``cache_timeout`` and varies on the current state and
+    query params, but not on the user. ``cache_scopes`` names the data the
+    response is built from (prefixed with ``cache_prefix``); bump those
+    version scopes when the data changes. Like every versioned response
+    cache this is off unless the cache is shared, since these timeouts run
+    to an hour and a bump must reach every worker.
+    """
     
-    def get_cache_key(self, request):
-        """Generate cache key from request params."""
-        params = request.query_params.copy()
-        params.pop('page', None)
-        
-        sorted_params = '&'.join(f"{k}={v}" for k, v in sorted(params.items()))
-        return f"ad_search:{sorted_params}"
\ No newline at end of file
+    cache_prefix = 'response'
+    cache_scopes = ()
+    cache_per_user = False
+    
+    def get_cache_action(self):
+        # Generic views have no ViewSet action; key entries per view instead
+        return self.__class__.__name__
+    
+    @property
+    def cached_actions(self):
+        return (self.get_cache_action(),)
+    
+    def get_cache_scopes(self, request):
+        return [f"{self.cache_prefix}:{scope}" for scope in self.cache_scopes]
+    
+    def get(self, request, *args, **kwargs):
+        cached = self.get_cached_response(request)
+        if cached is not None:
+            return cached
+        return super().get(request, *args, **kwargs)
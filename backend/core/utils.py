@@ -1,9 +1,14 @@
 import os
 import uuid
+from django.db.models import Count, IntegerField, Max, Q
+from django.db.models.functions import Cast, Substr
 from django.utils.text import slugify
 from django.utils import timezone
 import re
 
+# Longest numeric suffix generate_unique_slug appends (fits an integer cast)
+SLUG_SUFFIX_DIGITS = 7
+
 def generate_unique_filename(instance, filename):
     """Generate unique filename for uploads."""
     ext = filename.split('.')[-1]
@@ -18,24 +23,36 @@ def generate_unique_filename(instance, filename):
     return f"uploads/{filename}"
 
 def generate_unique_slug(instance, title, max_length=50):
-    """Generate unique slug for models."""
+    """
+    Generate unique slug for models.
+
+    Takes one query however many ads share the title: if the plain slug is
+    taken, the next ``-<n>`` suffix after the highest existing one is used.
+    Two concurrent saves can still pick the same slug, so callers retry on
+    IntegrityError (see Ad.save).
+    """
     base_slug = slugify(title)[:max_length]
-    slug = base_slug
-    
-    # Get the model class
-    model_class = instance.__class__
-    counter = 1
-    
-    while model_class.objects.filter(slug=slug).exclude(pk=instance.pk).exists():
-        slug = f"{base_slug}-{counter}"
-        counter += 1
-        
-        # Prevent infinite loop
-        if counter > 9999:
-            slug = f"{base_slug}-{uuid.uuid4().hex[:8]}"
-            break
-    
-    return slug
+    # Leave room for the suffix so it is never truncated away
+    stem = base_slug[:max_length - SLUG_SUFFIX_DIGITS - 1].rstrip('-')
+
+    taken = instance.__class__.objects.filter(
+        slug__startswith=stem
+    ).exclude(pk=instance.pk).aggregate(
+        base=Count('pk', filter=Q(slug=base_slug)),
+        # slugify() output is regex-safe
+        last=Max(
+            Cast(Substr('slug', len(stem) + 2), IntegerField()),
+            filter=Q(slug__regex=rf'^{stem}-[0-9]{{1,{SLUG_SUFFIX_DIGITS}}}$'),
+        ),
+    )
+
+    if not taken['base']:
+        return base_slug
+
+    counter = (taken['last'] or 0) + 1
+    if len(str(counter)) > SLUG_SUFFIX_DIGITS:
+        return f"{stem}-{uuid.uuid4().hex[:SLUG_SUFFIX_DIGITS]}"
+    return f"{stem}-{counter}"
 
 def get_client_ip(request):
     """Get client IP address from request."""
@@ -0,0 +1,182 @@
+# messaging/events.py
+import asyncio
+import json
+import logging
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "BROKER": "messaging.events.LocalEventBroker",
+    "KEEPALIVE": 15,  # Seconds between SSE keep-alive comments
+    "MAX_DURATION": 300,  # Seconds before a stream is closed (clients reconnect)
+    "QUEUE_SIZE": 100,  # Events buffered per connection before dropping
+    "TICKET_TTL": 30,  # Seconds a stream ticket can be redeemed
+}
+
+TICKET_SALT = "messaging.events.ticket"
+
+
+def get_config():
+    """Merge ``settings.MESSAGING_EVENTS`` over the defaults."""
+    return {**DEFAULT_SETTINGS, **getattr(settings, "MESSAGING_EVENTS", {})}
+
+
+class BaseEventBroker(ABC):
+    """
+    Pub/sub interface behind the messaging event stream.
+
+    ``publish`` may be called from any thread; ``subscribe`` is called from
+    the event loop serving the stream and returns an object with
+    ``async get(timeout)`` and ``close()``. Point
+    ``MESSAGING_EVENTS['BROKER']`` at a cross-process implementation (Redis,
+    Postgres LISTEN/NOTIFY, ...) when running several workers.
+    """
+
+    @classmethod
+    def from_settings(cls, config):
+        return cls()
+
+    @abstractmethod
+    def publish(self, user_id, event):
+        """Deliver ``event`` to every stream of ``user_id``."""
+
+    @abstractmethod
+    def subscribe(self, user_id):
+        """Open a subscription for the calling stream."""
+
+
+class LocalSubscription:
+    """One stream's queue, fed by LocalEventBroker from any thread."""
+
+    def __init__(self, broker, user_id, maxsize):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning(f"Dropping {event['type']} event for user {self.user_id}: queue full")
+
+    async def get(self, timeout):
+        """Wait for the next event; raises TimeoutError after ``timeout`` seconds."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalEventBroker(BaseEventBroker):
+    """
+    Process-local broker.
+
+    Only reaches streams served by the same process, so it suits a single
+    ASGI worker (or development).
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    @classmethod
+    def from_settings(cls, config):
+        return cls(queue_size=config["QUEUE_SIZE"])
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def subscribe(self, user_id):
+        subscription = LocalSubscription(self, user_id, self.queue_size)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Get the process-wide broker configured by ``MESSAGING_EVENTS['BROKER']``."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = get_config()
+                _broker = import_string(config["BROKER"]).from_settings(config)
+    return _broker
+
+
+def publish_event(user_ids, event_type, data):
+    """Publish an event to each user's streams once the current transaction commits."""
+    event = {"type": event_type, "data": data}
+
+    def send():
+        broker = get_broker()
+        for user_id in set(user_ids):
+            try:
+                broker.publish(user_id, event)
+            except Exception:
+                logger.exception(f"Failed to publish {event_type} event to user {user_id}")
+
+    transaction.on_commit(send)
+
+
+def format_sse(event):
+    """Encode an event as a Server-Sent Events frame."""
+    data = json.dumps(event["data"], cls=DjangoJSONEncoder)
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+
+# ========== Stream tickets ==========
+
+
+def issue_stream_ticket(user):
+    """
+    Get a short-lived, single-use ticket for opening ``user``'s event stream.
+
+    Browser EventSource cannot set headers; passing the ticket in the query
+    string keeps the long-lived JWT out of access and proxy logs.
+    """
+    return signing.dumps({"user": user.pk, "nonce": uuid.uuid4().hex}, salt=TICKET_SALT)
+
+
+def redeem_stream_ticket(ticket):
+    """Get the user id for a ticket, or None if it is invalid, expired or used."""
+    ttl = get_config()["TICKET_TTL"]
+    try:
+        payload = signing.loads(ticket, salt=TICKET_SALT, max_age=ttl)
+    except signing.BadSignature:  # includes SignatureExpired
+        return None
+
+    # Single use: only the first redeemer can add the marker
+    if not cache.add(f"event_stream_ticket:{payload['nonce']}", 1, timeout=ttl):
+        return None
+    return payload["user"]
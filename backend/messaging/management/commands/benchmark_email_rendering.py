@@ -0,0 +1,70 @@
+# messaging/management/commands/benchmark_email_rendering.py
+import time
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+from core.email_utils import EmailTemplateCache
+
+TEMPLATES = [
+    'messaging/new_message',
+    'messaging/new_conversation',
+    'messaging/ad_approved',
+    'messaging/ad_rejected',
+    'messaging/ad_expired',
+    'messaging/ad_expiring_soon',
+    'messaging/system_notification',
+]
+
+
+class Command(BaseCommand):
+    help = 'Measure per-email render cost of the messaging email templates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=500,
+            help='Emails rendered per template and strategy',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        contexts = [
+            {
+                'recipient_name': f'Recipient {index}',
+                'title': 'New message from Jane Doe',
+                'message': f'Is this still available? Message number {index}.',
+                'action_url': f'/messages/{index}',
+            }
+            for index in range(iterations)
+        ]
+
+        self.stdout.write(
+            f'{"template":<32} {"render+strip_tags":>18} {"cached":>10} {"batch":>10}  (us/email)'
+        )
+        for template_name in TEMPLATES:
+            EmailTemplateCache.get(template_name)  # warm both strategies equally
+
+            baseline = self._time(
+                lambda context: strip_tags(
+                    render_to_string(f'emails/{template_name}.html', context)
+                ),
+                contexts,
+            )
+            cached = self._time(
+                lambda context: EmailTemplateCache.render(template_name, context), contexts
+            )
+
+            start = time.perf_counter()
+            for _ in EmailTemplateCache.render_many(template_name, contexts):
+                pass
+            batch = (time.perf_counter() - start) / iterations * 1e6
+
+            self.stdout.write(f'{template_name:<32} {baseline:>18.1f} {cached:>10.1f} {batch:>10.1f}')
+
+    @staticmethod
+    def _time(render, contexts):
+        start = time.perf_counter()
+        for context in contexts:
+            render(context)
+        return (time.perf_counter() - start) / len(contexts) * 1e6
@@ -0,0 +1,50 @@
+# messaging/management/commands/drain_email_outbox.py
+import time
+from django.core.management.base import BaseCommand
+from messaging.models import OutboundEmail
+from messaging.outbox import EmailOutboxService, _config
+
+
+class Command(BaseCommand):
+    help = 'Send queued notification emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Emails sent per SMTP connection (default: EMAIL_OUTBOX BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Stop after attempting this many emails',
+        )
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help='Keep running, draining every POLL_INTERVAL seconds',
+        )
+        parser.add_argument(
+            '--requeue-dead',
+            action='store_true',
+            help='Move dead-lettered emails back to pending before draining',
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_dead']:
+            requeued = OutboundEmail.objects.filter(status='dead').update(
+                status='pending', attempts=0
+            )
+            self.stdout.write(f'Requeued {requeued} dead emails')
+
+        while True:
+            sent, failed = EmailOutboxService.drain(
+                batch_size=options['batch_size'], limit=options['limit']
+            )
+            if sent or failed or not options['watch']:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Sent {sent} emails, {failed} failed')
+                )
+            if not options['watch']:
+                break
+            time.sleep(_config()['POLL_INTERVAL'])
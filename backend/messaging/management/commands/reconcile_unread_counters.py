@@ -0,0 +1,16 @@
+# messaging/management/commands/reconcile_unread_counters.py
+from django.core.management.base import BaseCommand
+from messaging.services import UnreadCounterService
+
+
+class Command(BaseCommand):
+    help = 'Recompute conversation and notification unread counters from the source rows'
+
+    def handle(self, *args, **options):
+        conversations, users = UnreadCounterService.reconcile()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Repaired unread counters on {conversations} conversations and {users} users'
+            )
+        )
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:03
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, group_by):
+    return Coalesce(
+        models.Subquery(
+            queryset.order_by().values(group_by).annotate(total=models.Count('id')).values('total'),
+            output_field=models.IntegerField(),
+        ),
+        0,
+    )
+
+
+def backfill_unread_counters(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    Message = apps.get_model('messaging', 'Message')
+    Notification = apps.get_model('messaging', 'Notification')
+    User = apps.get_model('accounts', 'User')
+
+    unread = Message.objects.filter(conversation=models.OuterRef('pk'), is_read=False)
+    Conversation.objects.update(
+        buyer_unread=_count(unread.exclude(sender=models.OuterRef('buyer')), 'conversation'),
+        seller_unread=_count(unread.exclude(sender=models.OuterRef('seller')), 'conversation'),
+    )
+
+    User.objects.update(
+        unread_notifications=_count(
+            Notification.objects.filter(recipient=models.OuterRef('pk'), is_read=False),
+            'recipient',
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_unread_counters'),
+        ('messaging', '0002_conversation_last_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='buyer_unread',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='seller_unread',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_unread_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0004_outbound_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='awaiting_digest',
+            field=models.BooleanField(default=False, verbose_name='Awaiting Digest'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='digest',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='digest_notifications', to='messaging.outboundemail'),
+        ),
+        migrations.AddField(
+            model_name='outboundemail',
+            name='recipient',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbound_emails', to=settings.AUTH_USER_MODEL, verbose_name='Recipient'),
+        ),
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='notification',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbound_emails', to='messaging.notification', verbose_name='Notification'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['awaiting_digest', 'recipient'], name='messaging_n_awaitin_d16be9_idx'),
+        ),
+    ]
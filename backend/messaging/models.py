@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
@@ -42,6 +44,19 @@ class Conversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     last_message_at = models.DateTimeField(null=True, blank=True)
+    # Denormalized pointer to the newest message, maintained by messaging.signals
+    last_message = models.ForeignKey(
+        "Message",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        editable=False,
+    )
+    # Unread messages per participant, kept in step by messaging.signals
+    # and the mark-read methods below
+    buyer_unread = models.PositiveIntegerField(default=0, editable=False)
+    seller_unread = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = _("Conversation")
@@ -62,16 +77,33 @@ class Conversation(models.Model):
         """Get the other participant in this conversation."""
         return self.seller if user == self.buyer else self.buyer
 
+    def unread_field(self, user):
+        """Name of the unread counter for ``user``'s side of the conversation."""
+        user_id = getattr(user, "pk", user)
+        return "buyer_unread" if user_id == self.buyer_id else "seller_unread"
+
     def get_unread_count(self, user):
         """Get unread message count for a specific user."""
-        return self.messages.filter(is_read=False).exclude(sender=user).count()
+        return getattr(self, self.unread_field(user))
 
     def mark_as_read(self, user):
         """Mark all messages as read for a specific user."""
-        self.messages.filter(is_read=False).exclude(sender=user).update(
-            is_read=True, read_at=timezone.now()
+        updated = (
+            self.messages.filter(is_read=False)
+            .exclude(sender=user)
+            .update(is_read=True, read_at=timezone.now())
         )
 
+        # Decrement by what was marked rather than zeroing, so a message
+        # arriving meanwhile stays unread; reconcile_unread_counters repairs drift
+        field = self.unread_field(user)
+        if updated:
+            Conversation.objects.filter(pk=self.pk).update(
+                **{field: Greatest(F(field) - updated, 0)}
+            )
+            setattr(self, field, max(getattr(self, field) - updated, 0))
+        return updated
+
 
 class Message(models.Model):
     """Model for messages within a conversation."""
@@ -125,10 +157,25 @@ class Message(models.Model):
 
     def mark_as_read(self):
         """Mark this message as read."""
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = timezone.now()
-            self.save(update_fields=["is_read", "read_at"])
+        if self.is_read:
+            return
+
+        self.is_read = True
+        self.read_at = timezone.now()
+        # Conditional update so concurrent readers decrement only once
+        updated = Message.objects.filter(pk=self.pk, is_read=False).update(
+            is_read=True, read_at=self.read_at
+        )
+        if updated:
+            conversation = self.conversation
+            field = (
+                "seller_unread"
+                if self.sender_id == conversation.buyer_id
+                else "buyer_unread"
+            )
+            Conversation.objects.filter(pk=self.conversation_id).update(
+                **{field: Greatest(F(field) - 1, 0)}
+            )
 
 
 class Notification(models.Model):
@@ -180,6 +227,17 @@ class Notification(models.Model):
     read_at = models.DateTimeField(_("Read At"), null=True, blank=True)
     email_sent = models.BooleanField(_("Email Sent"), default=False)
 
+    # Email digests: set while the email waits to be coalesced with others,
+    # then ``digest`` points at the outbox email that carried it
+    awaiting_digest = models.BooleanField(_("Awaiting Digest"), default=False)
+    digest = models.ForeignKey(
+        "OutboundEmail",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="digest_notifications",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -190,6 +248,7 @@ class Notification(models.Model):
             models.Index(fields=["recipient", "-created_at"]),
             models.Index(fields=["recipient", "is_read"]),
             models.Index(fields=["notification_type"]),
+            models.Index(fields=["awaiting_digest", "recipient"]),
         ]
 
     def __str__(self):
@@ -197,7 +256,74 @@ class Notification(models.Model):
 
     def mark_as_read(self):
         """Mark this notification as read."""
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = timezone.now()
-            self.save(update_fields=["is_read", "read_at"])
+        if self.is_read:
+            return
+
+        self.is_read = True
+        self.read_at = timezone.now()
+        updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+            is_read=True, read_at=self.read_at
+        )
+        if updated:
+            User.objects.filter(pk=self.recipient_id).update(
+                unread_notifications=Greatest(F("unread_notifications") - 1, 0)
+            )
+
+
+class OutboundEmail(models.Model):
+    """
+    Outbox row for a notification email, delivered by messaging.outbox.
+
+    Carries either one ``notification`` or, for digests, the
+    ``digest_notifications`` of ``recipient``.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("dead", "Dead Letter"),
+    ]
+
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="outbound_emails",
+        verbose_name=_("Notification"),
+    )
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="outbound_emails",
+        verbose_name=_("Recipient"),
+    )
+    status = models.CharField(
+        _("Status"), max_length=10, choices=STATUS_CHOICES, default="pending"
+    )
+    attempts = models.PositiveIntegerField(_("Attempts"), default=0)
+    next_attempt_at = models.DateTimeField(_("Next Attempt At"), default=timezone.now)
+    last_error = models.TextField(_("Last Error"), blank=True)
+
+    # Claim held by a worker while the row is being sent
+    locked_by = models.CharField(max_length=32, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(_("Sent At"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Outbound Email")
+        verbose_name_plural = _("Outbound Emails")
+        ordering = ["next_attempt_at"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        if self.notification_id:
+            return f"Email for notification {self.notification_id} ({self.status})"
+        return f"Digest email for user {self.recipient_id} ({self.status})"
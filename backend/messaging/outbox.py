@@ -0,0 +1,284 @@
+# messaging/outbox.py
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "WORKERS": 2,  # Sender threads per process (0 = only drain_email_outbox sends)
+    "BATCH_SIZE": 50,  # Emails claimed and sent over one SMTP connection
+    "POLL_INTERVAL": 30,  # Seconds between sweeps for due retries and digests
+    "MAX_ATTEMPTS": 5,  # Attempts before an email is dead-lettered
+    "RETRY_BACKOFF": 60,  # Seconds before the first retry, doubled per attempt
+    "LOCK_TIMEOUT": 300,  # Seconds before a claimed email counts as abandoned
+}
+
+
+def _config():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "EMAIL_OUTBOX", {})}
+
+
+class EmailOutboxService:
+    """
+    Persistent outbox for notification emails.
+
+    ``enqueue`` only inserts OutboundEmail rows. A bounded pool of worker
+    threads - or the ``drain_email_outbox`` command, out of process - claims
+    due rows in batches and sends each batch over one reused SMTP
+    connection. Failures are retried with exponential backoff and moved to
+    the ``dead`` state after MAX_ATTEMPTS.
+    """
+
+    _lock = threading.Lock()
+    _workers = []
+    _wakeup = threading.Event()
+
+    # ========== Queueing ==========
+
+    @classmethod
+    def enqueue(cls, notification_ids):
+        """Queue one email per notification and wake the workers after commit."""
+        from .models import OutboundEmail
+
+        OutboundEmail.objects.bulk_create(
+            [OutboundEmail(notification_id=notification_id) for notification_id in notification_ids]
+        )
+        if _config()["WORKERS"] > 0:
+            transaction.on_commit(cls._wake)
+
+    @classmethod
+    def start(cls):
+        """Make sure the workers run (after commit) without waking them."""
+        if _config()["WORKERS"] > 0:
+            transaction.on_commit(cls._ensure_workers)
+
+    @classmethod
+    def _wake(cls):
+        cls._ensure_workers()
+        cls._wakeup.set()
+
+    # ========== Sending ==========
+
+    @classmethod
+    def claim(cls, batch_size):
+        """Lock up to ``batch_size`` due emails for the caller and return them."""
+        from .models import OutboundEmail
+
+        now = timezone.now()
+        stale = now - timedelta(seconds=_config()["LOCK_TIMEOUT"])
+        due = OutboundEmail.objects.filter(
+            Q(status="pending", next_attempt_at__lte=now)
+            | Q(status="sending", locked_at__lt=stale)
+        )
+
+        ids = list(due.order_by("next_attempt_at").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return []
+
+        # The UPDATE re-checks the due condition, so concurrent claimers
+        # (threads or processes) never end up with the same row
+        token = uuid.uuid4().hex
+        due.filter(id__in=ids).update(status="sending", locked_by=token, locked_at=now)
+
+        return list(
+            OutboundEmail.objects.filter(status="sending", locked_by=token)
+            .select_related(
+                "recipient",
+                "notification__recipient",
+                "notification__conversation",
+                "notification__ad",
+            )
+            .prefetch_related("digest_notifications")
+        )
+
+    @classmethod
+    def send_batch(cls, emails):
+        """Send claimed emails over one SMTP connection. Returns (sent, failed)."""
+        from core.email_utils import EmailService
+
+        sent, failed = [], []
+
+        if not EmailService._validate_email_config():
+            failed = [(email, "Email configuration is incomplete") for email in emails]
+        else:
+            connection = get_connection()
+            try:
+                connection.open()
+            except Exception as e:
+                failed = [(email, f"Connection failed: {e}") for email in emails]
+            else:
+                try:
+                    for email, message in cls._build_messages(emails, connection, sent, failed):
+                        try:
+                            message.send()
+                            sent.append(email)
+                        except Exception as e:
+                            failed.append((email, str(e)))
+                finally:
+                    connection.close()
+
+        cls._record(sent, failed)
+        return len(sent), len(failed)
+
+    @staticmethod
+    def _build_messages(emails, connection, sent, failed):
+        """
+        Render the batch, one ``EmailService.build_emails`` call per template.
+
+        Returns [(email, message)]; emails that need no message go to
+        ``sent`` and ones that cannot be rendered to ``failed``.
+        """
+        from core.email_utils import EmailService
+        from .services import NotificationService
+
+        by_template = defaultdict(list)
+        for email in emails:
+            try:
+                if email.notification_id:
+                    fields = NotificationService.email_fields(email.notification)
+                else:
+                    notifications = list(email.digest_notifications.all())
+                    if not notifications:
+                        # Everything in it was deleted meanwhile
+                        sent.append(email)
+                        continue
+                    fields = NotificationService.digest_email_fields(
+                        email.recipient, notifications
+                    )
+            except Exception as e:
+                failed.append((email, str(e)))
+                continue
+            by_template[fields.pop("template_name")].append((email, fields))
+
+        built = []
+        for template_name, group in by_template.items():
+            try:
+                messages = EmailService.build_emails(
+                    template_name, [fields for _, fields in group], connection=connection
+                )
+            except Exception:
+                # Render one by one so a single bad context fails only its email
+                messages = []
+                for email, fields in group:
+                    try:
+                        messages.append(
+                            EmailService.build_email(
+                                template_name=template_name, connection=connection, **fields
+                            )
+                        )
+                    except Exception as e:
+                        messages.append(None)
+                        failed.append((email, str(e)))
+            built += [
+                (email, message)
+                for (email, _), message in zip(group, messages)
+                if message is not None
+            ]
+        return built
+
+    @classmethod
+    def _record(cls, sent, failed):
+        """Mark sent emails done and schedule retries (or dead-letter) for failures."""
+        from .models import Notification, OutboundEmail
+
+        config = _config()
+        now = timezone.now()
+
+        if sent:
+            OutboundEmail.objects.filter(id__in=[email.id for email in sent]).update(
+                status="sent", sent_at=now, last_error="", locked_by="", locked_at=None
+            )
+            Notification.objects.filter(
+                Q(id__in=[email.notification_id for email in sent if email.notification_id])
+                | Q(digest__in=[email.id for email in sent if not email.notification_id])
+            ).update(email_sent=True)
+            for email in sent:
+                logger.info(f"{email} sent")
+
+        for email, error in failed:
+            email.attempts += 1
+            email.last_error = error
+            email.locked_by = ""
+            email.locked_at = None
+            if email.attempts >= config["MAX_ATTEMPTS"]:
+                email.status = "dead"
+                logger.error(f"Giving up on {email} after {email.attempts} attempts: {error}")
+            else:
+                email.status = "pending"
+                email.next_attempt_at = now + timedelta(
+                    seconds=config["RETRY_BACKOFF"] * 2 ** (email.attempts - 1)
+                )
+                logger.warning(
+                    f"{email} failed (attempt {email.attempts}), "
+                    f"retrying at {email.next_attempt_at}: {error}"
+                )
+
+        if failed:
+            OutboundEmail.objects.bulk_update(
+                [email for email, _ in failed],
+                ["attempts", "last_error", "locked_by", "locked_at", "status", "next_attempt_at"],
+            )
+
+    @classmethod
+    def drain(cls, batch_size=None, limit=None):
+        """
+        Schedule due digests, then send due emails batch by batch until none
+        are left.
+
+        Stops early once ``limit`` emails were attempted. Returns the
+        (sent, failed) totals.
+        """
+        from .services import NotificationDigestService
+
+        batch_size = batch_size or _config()["BATCH_SIZE"]
+        total_sent = total_failed = 0
+
+        # Turn elapsed digest windows into outbox emails first
+        NotificationDigestService.schedule_due()
+
+        while limit is None or total_sent + total_failed < limit:
+            size = batch_size if limit is None else min(batch_size, limit - total_sent - total_failed)
+            emails = cls.claim(size)
+            if not emails:
+                break
+            sent, failed = cls.send_batch(emails)
+            total_sent += sent
+            total_failed += failed
+
+        return total_sent, total_failed
+
+    # ========== Background workers ==========
+
+    @classmethod
+    def _ensure_workers(cls):
+        """Start the sender threads (up to WORKERS) on first use."""
+        with cls._lock:
+            cls._workers = [worker for worker in cls._workers if worker.is_alive()]
+            for index in range(len(cls._workers), _config()["WORKERS"]):
+                worker = threading.Thread(
+                    target=cls._run, name=f"email-outbox-{index}", daemon=True
+                )
+                worker.start()
+                cls._workers.append(worker)
+
+    @classmethod
+    def _run(cls):
+        """Drain the outbox whenever woken, and periodically for retries."""
+        while True:
+            cls._wakeup.wait(_config()["POLL_INTERVAL"])
+            cls._wakeup.clear()
+            close_old_connections()
+            try:
+                cls.drain()
+            except Exception as e:
+                logger.error(f"Email outbox worker failed: {e}")
+            finally:
+                close_old_connections()
@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model
 from .models import Conversation, Message, Notification
 from ads.serializers import AdListSerializer
 from accounts.serializers import UserPublicSerializer
+from core.pagination import KeysetPagination
 from django.utils.timesince import timesince
 from django.db.models import Q  # <-- required for filtering blocked users
 
@@ -134,10 +135,9 @@ class ConversationSerializer(serializers.ModelSerializer):
 
     def get_last_message(self, obj):
         """Get the last message in this conversation."""
-        # Use order_by to ensure we get the actual last message
-        last_msg = obj.messages.order_by('-created_at').first()
-        if last_msg:
-            return MessageSerializer(last_msg, context=self.context).data
+        # Denormalized FK kept current by messaging.signals
+        if obj.last_message:
+            return MessageSerializer(obj.last_message, context=self.context).data
         return None
 
     def get_unread_count(self, obj):
@@ -256,7 +256,7 @@ class ConversationCreateSerializer(serializers.Serializer):
 
         if not created and not conversation.is_active:
             conversation.is_active = True
-            conversation.save()
+            conversation.save(update_fields=["is_active", "updated_at"])
 
         if initial_message_content:
             Message.objects.create(
@@ -270,12 +270,22 @@ class ConversationCreateSerializer(serializers.Serializer):
 
 
 class ConversationDetailSerializer(serializers.ModelSerializer):
-    """Detailed serializer for a single conversation with messages."""
+    """
+    Detailed serializer for a single conversation with messages.
+
+    Only the newest ``message_window`` messages are included. When there are
+    older ones, ``messages_cursor`` is set; request the conversation again
+    with ``?before=<messages_cursor>`` for the window before it.
+    """
+
+    message_window = 50
 
     buyer = UserPublicSerializer(read_only=True)
     seller = UserPublicSerializer(read_only=True)
     ad = AdListSerializer(read_only=True)
     messages = serializers.SerializerMethodField()
+    has_more_messages = serializers.SerializerMethodField()
+    messages_cursor = serializers.SerializerMethodField()
     unread_count = serializers.SerializerMethodField()
     other_user = serializers.SerializerMethodField()
 
@@ -292,15 +302,48 @@ class ConversationDetailSerializer(serializers.ModelSerializer):
             "updated_at",
             "last_message_at",
             "messages",
+            "has_more_messages",
+            "messages_cursor",
             "unread_count",
             "other_user",
         ]
 
     def get_messages(self, obj):
-        """Get all messages in this conversation."""
-        messages = obj.messages.order_by("created_at")
+        """Get the requested window of messages, oldest first."""
+        messages, _ = self.get_message_window(obj)
         return MessageSerializer(messages, many=True, context=self.context).data
 
+    def get_has_more_messages(self, obj):
+        """Check whether older messages exist before this window."""
+        return self.get_message_window(obj)[1]
+
+    def get_messages_cursor(self, obj):
+        """Get the cursor for the window of older messages, if any."""
+        messages, has_more = self.get_message_window(obj)
+        if not has_more:
+            return None
+        oldest = messages[0]
+        return KeysetPagination.encode_cursor([oldest.created_at, oldest.pk])
+
+    def get_message_window(self, obj):
+        """Load (messages, has_more) once per conversation."""
+        windows = self.__dict__.setdefault("_message_windows", {})
+        if obj.pk not in windows:
+            # Newest first so the window is an index range scan
+            queryset = obj.messages.select_related("sender").order_by("-created_at", "-id")
+            ordering = KeysetPagination.get_ordering(queryset)
+
+            request = self.context.get("request")
+            before = request.query_params.get("before") if request else None
+            if before:
+                values = KeysetPagination.decode_cursor(before, ordering)
+                queryset = queryset.filter(KeysetPagination.after(ordering, values))
+
+            rows = list(queryset[: self.message_window + 1])
+            has_more = len(rows) > self.message_window
+            windows[obj.pk] = (rows[: self.message_window][::-1], has_more)
+        return windows[obj.pk]
+
     def get_unread_count(self, obj):
         """Get unread message count for current user."""
         request = self.context.get("request")
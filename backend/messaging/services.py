@@ -1,8 +1,14 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
 from django.conf import settings
-from .models import Notification
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Min, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+from django.db.models.functions import Coalesce, Greatest
+from .models import Conversation, Notification
+from .outbox import EmailOutboxService
 from core.email_utils import EmailService
 import logging
-import threading
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +20,9 @@ class NotificationService:
     def create_notification(recipient, notification_type, title, message, **kwargs):
         """Create a notification for a user."""
         
+        send_email = NotificationService._should_send_email(recipient, notification_type)
+        digest = send_email and NotificationDigestService.applies_to(notification_type)
+        
         notification = Notification.objects.create(
             recipient=recipient,
             notification_type=notification_type,
@@ -22,85 +31,162 @@ class NotificationService:
             conversation=kwargs.get('conversation'),
             ad=kwargs.get('ad'),
             action_url=kwargs.get('action_url'),
+            awaiting_digest=digest,
         )
+        UnreadCounterService.notifications_created({recipient.pk: 1})
+        NotificationService._publish(notification)
         
-        # Check which email preference to use based on notification type
-        should_send_email = False
-        
-        if notification_type in ['new_message', 'new_conversation']:
-            # For messaging notifications, check email_message_notifications
-            should_send_email = getattr(recipient, 'email_message_notifications', True)
-        else:
-            # For other notifications (ad updates, etc), check email_notifications
-            should_send_email = getattr(recipient, 'email_notifications', True)
-        
-        # Send email asynchronously if preference is enabled
-        if should_send_email and settings.NOTIFICATION_SETTINGS.get('EMAIL_NOTIFICATIONS', False):
-            # Use threading to send email in background without blocking response
-            email_thread = threading.Thread(
-                target=NotificationService._send_email_notification,
-                args=(notification.id, recipient.id),
-                daemon=True
-            )
-            email_thread.start()
+        # Queue the email in the outbox if preference is enabled, or hold
+        # it for the recipient's next digest
+        if digest:
+            EmailOutboxService.start()
+            logger.info(f"Email notification held for digest to {recipient.email}")
+        elif send_email:
+            EmailOutboxService.enqueue([notification.id])
             logger.info(f"Email notification queued for {recipient.email}")
         
         return notification
     
     @staticmethod
-    def _send_email_notification(notification_id, recipient_id):
-        """Send email notification using existing EmailService (runs in background thread)."""
+    def create_bulk_notifications(notifications):
+        """
+        Create many notifications at once.
         
-        try:
-            # Import here to avoid circular imports and ensure fresh DB connection in thread
-            from .models import Notification
-            from accounts.models import User
-            
-            # Fetch fresh instances in this thread
-            notification = Notification.objects.select_related('conversation', 'ad').get(id=notification_id)
-            recipient = User.objects.get(id=recipient_id)
-            
-            # Map notification types to template names
-            template_map = {
-                'new_message': 'messaging/new_message',
-                'new_conversation': 'messaging/new_conversation',
-                'ad_approved': 'messaging/ad_approved',
-                'ad_rejected': 'messaging/ad_rejected',
-                'ad_expired': 'messaging/ad_expired',
-                'ad_expiring_soon': 'messaging/ad_expiring_soon',
-                'system': 'messaging/system_notification',
-            }
-            
-            template_name = template_map.get(notification.notification_type, 'messaging/generic')
-            
-            # Prepare context for email templates
-            context = {
-                'recipient_name': recipient.get_full_name(),
-                'user': recipient,
-                'title': notification.title,
-                'message': notification.message,
-                'notification': notification,
-                'action_url': notification.action_url,
-            }
-            
-            # Use existing EmailService to send email (maintains consistency)
-            success = EmailService.send_email(
-                subject=notification.title,
-                recipient_list=[recipient.email],
-                template_name=template_name,
-                context=context,
-                fail_silently=True  # Don't break app if email fails
+        Takes unsaved Notification instances (with ``recipient`` loaded),
+        inserts them with one bulk_create and queues the emails for the
+        whole batch in the outbox.
+        """
+        email_flags = {}
+        for notification in notifications:
+            send_email = NotificationService._should_send_email(
+                notification.recipient, notification.notification_type
             )
-            
-            if success:
-                notification.email_sent = True
-                notification.save(update_fields=['email_sent'])
-                logger.info(f"Email notification sent to {recipient.email}")
-            else:
-                logger.warning(f"Failed to send email notification to {recipient.email}")
-            
-        except Exception as e:
-            logger.error(f"Failed to send email notification: {str(e)}")
+            notification.awaiting_digest = send_email and NotificationDigestService.applies_to(
+                notification.notification_type
+            )
+            email_flags[id(notification)] = send_email and not notification.awaiting_digest
+        
+        created = Notification.objects.bulk_create(notifications, batch_size=500)
+        UnreadCounterService.notifications_created(
+            Counter(notification.recipient_id for notification in created)
+        )
+        for notification in created:
+            NotificationService._publish(notification)
+        
+        email_ids = [
+            notification.id
+            for notification in created
+            if notification.id and email_flags[id(notification)]
+        ]
+        
+        if email_ids:
+            EmailOutboxService.enqueue(email_ids)
+            logger.info(f"{len(email_ids)} email notifications queued")
+        if any(notification.awaiting_digest for notification in created):
+            EmailOutboxService.start()
+        
+        return created
+    
+    @staticmethod
+    def _publish(notification):
+        """Push the notification to the recipient's open event streams."""
+        from .events import publish_event
+        from .serializers import NotificationSerializer
+        
+        publish_event(
+            [notification.recipient_id],
+            'notification',
+            NotificationSerializer(notification).data,
+        )
+    
+    @staticmethod
+    def _should_send_email(recipient, notification_type):
+        """Check the site setting and the recipient's email preferences."""
+        if not settings.NOTIFICATION_SETTINGS.get('EMAIL_NOTIFICATIONS', False):
+            return False
+        
+        if notification_type in ['new_message', 'new_conversation']:
+            # For messaging notifications, check email_message_notifications
+            return getattr(recipient, 'email_message_notifications', True)
+        
+        # For other notifications (ad updates, etc), check email_notifications
+        return getattr(recipient, 'email_notifications', True)
+    
+    @staticmethod
+    def email_fields(notification):
+        """
+        Get the ``EmailService.build_email`` arguments for a notification
+        loaded with its recipient (subject, recipient_list, template_name,
+        context).
+        """
+        
+        recipient = notification.recipient
+        
+        # Map notification types to template names
+        template_map = {
+            'new_message': 'messaging/new_message',
+            'new_conversation': 'messaging/new_conversation',
+            'ad_approved': 'messaging/ad_approved',
+            'ad_rejected': 'messaging/ad_rejected',
+            'ad_expired': 'messaging/ad_expired',
+            'ad_expiring_soon': 'messaging/ad_expiring_soon',
+            'system': 'messaging/system_notification',
+        }
+        
+        template_name = template_map.get(notification.notification_type, 'messaging/generic')
+        
+        # Prepare context for email templates
+        context = {
+            'recipient_name': recipient.get_full_name(),
+            'user': recipient,
+            'title': notification.title,
+            'message': notification.message,
+            'notification': notification,
+            'action_url': notification.action_url,
+        }
+        
+        return {
+            'subject': notification.title,
+            'recipient_list': [recipient.email],
+            'template_name': template_name,
+            'context': context,
+        }
+    
+    @staticmethod
+    def digest_email_fields(recipient, notifications):
+        """Get the ``EmailService.build_email`` arguments for a digest of ``notifications``."""
+        
+        count = len(notifications)
+        title = f"You have {count} new notification{'s' if count != 1 else ''}"
+        
+        context = {
+            'recipient_name': recipient.get_full_name(),
+            'user': recipient,
+            'title': title,
+            'notifications': notifications,
+        }
+        
+        return {
+            'subject': title,
+            'recipient_list': [recipient.email],
+            'template_name': 'messaging/digest',
+            'context': context,
+        }
+    
+    @staticmethod
+    def build_email(notification, connection=None):
+        """Render the (unsent) email for a notification loaded with its recipient."""
+        return EmailService.build_email(
+            connection=connection, **NotificationService.email_fields(notification)
+        )
+    
+    @staticmethod
+    def build_digest_email(recipient, notifications, connection=None):
+        """Render the (unsent) digest email summarizing ``notifications``."""
+        return EmailService.build_email(
+            connection=connection,
+            **NotificationService.digest_email_fields(recipient, notifications),
+        )
     
     # =========================================================================
     # SPECIFIC NOTIFICATION CREATORS
@@ -174,6 +260,38 @@ class NotificationService:
             action_url=f"/dashboard/my-ads"
         )
     
+    @staticmethod
+    def send_ad_status_notifications(ads, notification_type, reason=None):
+        """
+        Notify the owners of ``ads`` (with ``user`` loaded) about an approval
+        or rejection in one batch.
+        """
+        notifications = []
+        
+        for ad in ads:
+            if notification_type == 'ad_approved':
+                title = "Your ad has been approved!"
+                message_text = f"Your ad '{ad.title}' has been approved and is now live."
+                action_url = f"/ads/{ad.slug}"
+            else:
+                title = "Your ad was not approved"
+                message_text = f"Your ad '{ad.title}' was not approved."
+                ad_reason = reason or ad.rejection_reason
+                if ad_reason:
+                    message_text += f" Reason: {ad_reason}"
+                action_url = f"/dashboard/my-ads"
+            
+            notifications.append(Notification(
+                recipient=ad.user,
+                notification_type=notification_type,
+                title=title,
+                message=message_text,
+                ad=ad,
+                action_url=action_url,
+            ))
+        
+        return NotificationService.create_bulk_notifications(notifications)
+    
     @staticmethod
     def send_ad_expired_notification(recipient, ad):
         """Send notification when ad expires."""
@@ -206,6 +324,36 @@ class NotificationService:
             action_url=f"/dashboard/my-ads"
         )
     
+    @staticmethod
+    def send_ad_expiry_notifications(ads, notification_type, now=None):
+        """
+        Notify the owners of ``ads`` (with ``user`` loaded) that their ads
+        expired (``ad_expired``) or are about to (``ad_expiring_soon``), in
+        one batch.
+        """
+        now = now or timezone.now()
+        notifications = []
+        
+        for ad in ads:
+            if notification_type == 'ad_expired':
+                title = "Your ad has expired"
+                message_text = f"Your ad '{ad.title}' has expired. You can renew it from your dashboard."
+            else:
+                days_left = max((ad.expires_at - now).days, 0)
+                title = f"Your ad expires in {days_left} days"
+                message_text = f"Your ad '{ad.title}' will expire in {days_left} days. Renew it to keep it active."
+            
+            notifications.append(Notification(
+                recipient=ad.user,
+                notification_type=notification_type,
+                title=title,
+                message=message_text,
+                ad=ad,
+                action_url="/dashboard/my-ads",
+            ))
+        
+        return NotificationService.create_bulk_notifications(notifications)
+    
     @staticmethod
     def send_system_notification(recipient, title, message, action_url=None):
         """Send a system notification."""
@@ -216,4 +364,181 @@ class NotificationService:
             title=title,
             message=message,
             action_url=action_url
-        )
\ No newline at end of file
+        )
+
+class NotificationDigestService:
+    """
+    Coalesces notification emails per recipient.
+    
+    Notifications of the EMAIL_DIGEST_TYPES are stored with
+    ``awaiting_digest`` instead of being queued. Once a recipient's oldest
+    waiting notification is EMAIL_DIGEST_WINDOW seconds old, ``schedule_due``
+    hands all of them to the outbox as one email (the regular template when
+    only one is waiting). The outbox runs it before every drain.
+    """
+    
+    @staticmethod
+    def get_window():
+        """Seconds notification emails are held back; 0 disables digests."""
+        return settings.NOTIFICATION_SETTINGS.get('EMAIL_DIGEST_WINDOW', 0)
+    
+    @staticmethod
+    def applies_to(notification_type):
+        """Check whether emails for ``notification_type`` are digested."""
+        return (
+            NotificationDigestService.get_window() > 0
+            and notification_type in settings.NOTIFICATION_SETTINGS.get('EMAIL_DIGEST_TYPES', [])
+        )
+    
+    @staticmethod
+    def schedule_due(limit=500):
+        """
+        Queue digest emails for recipients whose window has elapsed.
+        
+        Returns the number of outbox emails created.
+        """
+        from accounts.models import User
+        from .models import OutboundEmail
+        
+        cutoff = timezone.now() - timedelta(seconds=NotificationDigestService.get_window())
+        recipient_ids = list(
+            Notification.objects.filter(awaiting_digest=True)
+            .order_by()
+            .values('recipient')
+            .annotate(oldest=Min('created_at'))
+            .filter(oldest__lte=cutoff)
+            .values_list('recipient', flat=True)[:limit]
+        )
+        if not recipient_ids:
+            return 0
+        
+        recipients = User.objects.in_bulk(recipient_ids)
+        scheduled = 0
+        
+        for recipient_id in recipient_ids:
+            with transaction.atomic():
+                # Claim with a conditional UPDATE rather than select_for_update
+                # (a no-op on SQLite): a row already claimed by a concurrent
+                # scheduler no longer matches, so each lands in one digest only
+                digest = OutboundEmail.objects.create(recipient_id=recipient_id)
+                claimed = Notification.objects.filter(
+                    recipient_id=recipient_id, awaiting_digest=True, digest__isnull=True
+                ).update(awaiting_digest=False, digest=digest)
+                if not claimed:
+                    digest.delete()
+                    continue  # Taken by a concurrent scheduler
+                
+                waiting = Notification.objects.filter(digest=digest).order_by('created_at')
+                
+                # Preferences may have changed while the emails were held
+                recipient = recipients[recipient_id]
+                allowed = [
+                    notification.id
+                    for notification in waiting
+                    if NotificationService._should_send_email(recipient, notification.notification_type)
+                ]
+                if len(allowed) > 1:
+                    Notification.objects.filter(digest=digest).exclude(id__in=allowed).update(
+                        digest=None
+                    )
+                    scheduled += 1
+                    continue
+                
+                Notification.objects.filter(digest=digest).update(digest=None)
+                digest.delete()
+                if allowed:
+                    OutboundEmail.objects.create(notification_id=allowed[0])
+                    scheduled += 1
+        
+        return scheduled
+
+
+class UnreadCounterService:
+    """
+    Denormalized unread counters behind the message and notification badges.
+    
+    Conversation.buyer_unread/seller_unread and User.unread_notifications
+    are adjusted with atomic F() updates as messages and notifications are
+    created or read; ``reconcile`` repairs any drift (e.g. from deletes).
+    """
+    
+    @staticmethod
+    def message_created(message):
+        """Count a new message against the recipient's side of the conversation."""
+        conversation = message.conversation
+        field = 'seller_unread' if message.sender_id == conversation.buyer_id else 'buyer_unread'
+        Conversation.objects.filter(pk=conversation.pk).update(**{field: F(field) + 1})
+    
+    @staticmethod
+    def notifications_created(counts):
+        """Add ``{user_id: new_notifications}`` to the users' unread counters."""
+        from accounts.models import User
+        
+        users_by_count = defaultdict(list)
+        for user_id, count in counts.items():
+            users_by_count[count].append(user_id)
+        
+        for count, user_ids in users_by_count.items():
+            User.objects.filter(pk__in=user_ids).update(
+                unread_notifications=F('unread_notifications') + count
+            )
+    
+    @staticmethod
+    def notifications_read(user, count):
+        """Take ``count`` newly read notifications off the user's counter."""
+        from accounts.models import User
+        
+        if count:
+            User.objects.filter(pk=user.pk).update(
+                unread_notifications=Greatest(F('unread_notifications') - count, 0)
+            )
+    
+    @staticmethod
+    def unread_messages(user):
+        """Total unread messages for ``user`` across their conversations."""
+        totals = Conversation.objects.filter(Q(buyer=user) | Q(seller=user)).aggregate(
+            buyer=Sum('buyer_unread', filter=Q(buyer=user)),
+            seller=Sum('seller_unread', filter=Q(seller=user)),
+        )
+        return (totals['buyer'] or 0) + (totals['seller'] or 0)
+    
+    @staticmethod
+    def reconcile():
+        """
+        Recompute every counter from the Message and Notification rows.
+        
+        Returns ``(conversations, users)`` - how many rows were corrected.
+        """
+        from accounts.models import User
+        from .models import Message
+        
+        def count_of(queryset, group_by):
+            return Coalesce(
+                Subquery(
+                    queryset.order_by().values(group_by).annotate(total=Count('id')).values('total'),
+                    output_field=IntegerField(),
+                ),
+                0,
+            )
+        
+        unread = Message.objects.filter(conversation=OuterRef('pk'), is_read=False)
+        buyer_actual = count_of(unread.exclude(sender=OuterRef('buyer')), 'conversation')
+        seller_actual = count_of(unread.exclude(sender=OuterRef('seller')), 'conversation')
+        conversations = Conversation.objects.annotate(
+            buyer_actual=buyer_actual, seller_actual=seller_actual
+        ).filter(~Q(buyer_unread=F('buyer_actual')) | ~Q(seller_unread=F('seller_actual')))
+        fixed_conversations = Conversation.objects.filter(
+            pk__in=list(conversations.values_list('pk', flat=True))
+        ).update(buyer_unread=buyer_actual, seller_unread=seller_actual)
+        
+        notifications_actual = count_of(
+            Notification.objects.filter(recipient=OuterRef('pk'), is_read=False), 'recipient'
+        )
+        users = User.objects.annotate(actual=notifications_actual).exclude(
+            unread_notifications=F('actual')
+        )
+        fixed_users = User.objects.filter(
+            pk__in=list(users.values_list('pk', flat=True))
+        ).update(unread_notifications=notifications_actual)
+        
+        return fixed_conversations, fixed_users
@@ -1,8 +1,12 @@
 # messaging/signals.py
-from django.db.models.signals import post_save
+from django.db import models
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from .events import publish_event
 from .models import Conversation, Message
-from .services import NotificationService
+from .serializers import MessageSerializer
+from .services import NotificationService, UnreadCounterService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,12 +30,30 @@ def conversation_created(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=Message)
 def message_created(sender, instance, created, **kwargs):
-    """Handle message creation - update conversation timestamp ONLY on creation."""
+    """Handle message creation - update conversation pointers ONLY on creation."""
     
+    if not created:
+        return
+
+    # Point the conversation at its newest message (any type) so inbox
+    # listings can select_related it instead of querying per row.
+    # Conditional UPDATE keeps concurrent sends from moving it backwards.
+    Conversation.objects.filter(pk=instance.conversation_id).filter(
+        Q(last_message__isnull=True) | Q(last_message_id__lt=instance.pk)
+    ).update(last_message=instance)
+    UnreadCounterService.message_created(instance)
+
+    # Push to both participants' open event streams (other tabs included)
+    conversation = instance.conversation
+    publish_event(
+        [conversation.buyer_id, conversation.seller_id],
+        'message',
+        MessageSerializer(instance).data,
+    )
+
     # CRITICAL: Only update on creation, not on every save (like marking as read)
-    if created and instance.message_type != 'system':
+    if instance.message_type != 'system':
         # Update conversation's last_message_at timestamp
-        conversation = instance.conversation
         
         # Only update if this message is newer than current last_message_at
         # This prevents race conditions with concurrent message sends
@@ -50,4 +72,20 @@ def message_created(sender, instance, created, **kwargs):
             )
         
         # NOTE: Notification is sent from the view to avoid duplicate notifications
-        # and to ensure proper response timing
\ No newline at end of file
+        # and to ensure proper response timing
+
+
+@receiver(post_delete, sender=Message)
+def message_deleted(sender, instance, origin=None, **kwargs):
+    """Repoint the conversation at its newest remaining message."""
+    origin_model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    if origin_model is not Message:
+        # Cascade from a conversation, ad or user - nothing left to repoint
+        return
+
+    latest = Message.objects.filter(conversation=OuterRef('pk')).order_by('-created_at', '-id')
+
+    # SET_NULL has already cleared last_message if it pointed here
+    Conversation.objects.filter(
+        pk=instance.conversation_id, last_message__isnull=True
+    ).update(last_message=Subquery(latest.values('id')[:1]))
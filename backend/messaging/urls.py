@@ -1,6 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ConversationViewSet, MessageViewSet, NotificationViewSet
+from .views import (
+    ConversationViewSet,
+    MessageViewSet,
+    NotificationViewSet,
+    event_stream,
+    event_stream_ticket,
+)
 
 app_name = 'messaging'
 
@@ -10,5 +16,7 @@ router.register(r'messages', MessageViewSet, basename='message')
 router.register(r'notifications', NotificationViewSet, basename='notification')
 
 urlpatterns = [
+    path('events/', event_stream, name='event-stream'),
+    path('events/ticket/', event_stream_ticket, name='event-stream-ticket'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,13 +1,21 @@
 # messaging/views.py
+import asyncio
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
 from django.db.models import Q
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
+from django.http import JsonResponse, StreamingHttpResponse
 from datetime import timedelta
 
+from accounts.models import User
+from ads.models import AdImage
 from .models import Conversation, Message, Notification
 from .serializers import (
     ConversationSerializer,
@@ -18,7 +26,14 @@ from .serializers import (
     NotificationSerializer,
     MessageStatsSerializer,
 )
-from .services import NotificationService
+from .events import (
+    format_sse,
+    get_broker,
+    get_config as get_events_config,
+    issue_stream_ticket,
+    redeem_stream_ticket,
+)
+from .services import NotificationService, UnreadCounterService
 from core.pagination import StandardResultsSetPagination
 
 import logging
@@ -44,15 +59,21 @@ class ConversationViewSet(viewsets.ModelViewSet):
         """Get conversations for the current user."""
         user = self.request.user
 
-        queryset = (
-            Conversation.objects.filter(Q(buyer=user) | Q(seller=user))
-            .select_related(
-                "buyer", "seller", "ad", "ad__category", "ad__city", "ad__state"
-            )
-            .prefetch_related("messages")
-            .distinct()
+        queryset = Conversation.objects.filter(
+            Q(buyer=user) | Q(seller=user)
+        ).select_related(
+            "buyer", "seller", "ad", "ad__category", "ad__city", "ad__state"
         )
 
+        if self.action == "list":
+            # Inbox rows carry their last message (and the denormalized unread
+            # counters), so the serializer doesn't query per conversation
+            queryset = queryset.select_related(
+                "ad__user", "last_message", "last_message__sender"
+            ).prefetch_related(AdImage.prefetch_primary("ad__images"))
+        elif self.action == "retrieve":
+            queryset = queryset.prefetch_related(AdImage.prefetch_primary("ad__images"))
+
         # Skip status filtering for action endpoints that need to access any conversation
         if self.action in ["block", "unblock", "archive", "unarchive"]:
             ad_id = self.request.query_params.get("ad_id")
@@ -100,8 +121,10 @@ class ConversationViewSet(viewsets.ModelViewSet):
         """Retrieve a conversation and mark messages as read."""
         instance = self.get_object()
 
-        # Mark all messages as read for the current user
-        instance.mark_as_read(request.user)
+        # Mark all messages as read for the current user (paging through older
+        # history with ?before= doesn't change what's unread)
+        if "before" not in request.query_params:
+            instance.mark_as_read(request.user)
 
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
@@ -185,7 +208,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
             )
 
         conversation.is_active = False
-        conversation.save()
+        conversation.save(update_fields=["is_active", "updated_at"])
 
         return Response({"message": "Conversation archived successfully."})
 
@@ -201,7 +224,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
             )
 
         conversation.is_active = True
-        conversation.save()
+        conversation.save(update_fields=["is_active", "updated_at"])
 
         return Response(
             {
@@ -215,18 +238,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def unread_count(self, request):
         """Get total unread message count."""
-        user = request.user
-
-        unread_count = (
-            Message.objects.filter(
-                conversation__in=Conversation.objects.filter(
-                    Q(buyer=user) | Q(seller=user)
-                ),
-                is_read=False,
-            )
-            .exclude(sender=user)
-            .count()
-        )
+        unread_count = UnreadCounterService.unread_messages(request.user)
 
         return Response({"unread_count": unread_count})
 
@@ -245,11 +257,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
             .count()
         )
 
-        unread = (
-            Message.objects.filter(conversation__in=conversations, is_read=False)
-            .exclude(sender=user)
-            .count()
-        )
+        unread = UnreadCounterService.unread_messages(user)
 
         stats = {
             "total_conversations": conversations.count(),
@@ -383,11 +391,7 @@ class MessageViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        updated_count = (
-            Message.objects.filter(conversation=conversation, is_read=False)
-            .exclude(sender=request.user)
-            .update(is_read=True, read_at=timezone.now())
-        )
+        updated_count = conversation.mark_as_read(request.user)
 
         return Response({"message": f"{updated_count} messages marked as read."})
 
@@ -448,15 +452,15 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         updated_count = Notification.objects.filter(
             recipient=request.user, is_read=False
         ).update(is_read=True, read_at=timezone.now())
+        UnreadCounterService.notifications_read(request.user, updated_count)
 
         return Response({"message": f"{updated_count} notifications marked as read."})
 
     @action(detail=False, methods=["get"])
     def unread_count(self, request):
         """Get unread notification count."""
-        count = Notification.objects.filter(
-            recipient=request.user, is_read=False
-        ).count()
+        # Denormalized on the user row, which authentication already loaded
+        count = request.user.unread_notifications
 
         return Response({"unread_count": count})
 
@@ -468,3 +472,80 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         ).delete()
 
         return Response({"message": f"{deleted_count} notifications cleared."})
+
+
+async def event_stream(request):
+    """
+    Server-Sent Events stream of new messages and notifications.
+
+    Pushes ``message`` and ``notification`` events for the authenticated
+    user as they are created, replacing the ``since`` / ``unread_count``
+    polling. Requires the ASGI entry point (``backend.asgi``). Authenticate
+    with the usual ``Authorization: Bearer`` header, or for browser
+    EventSource, which cannot set headers, with ``?ticket=`` from
+    ``event_stream_ticket``.
+    """
+    user = await sync_to_async(_authenticate_stream)(request)
+    if user is None:
+        return JsonResponse(
+            {"error": "Authentication credentials were not provided."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+    config = get_events_config()
+
+    async def stream():
+        subscription = get_broker().subscribe(user.pk)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + config["MAX_DURATION"]
+        try:
+            yield "retry: 5000\n\n"
+            while loop.time() < deadline:
+                try:
+                    event = await subscription.get(timeout=config["KEEPALIVE"])
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Disable proxy buffering (nginx)
+    return response
+
+
+def _authenticate_stream(request):
+    """Resolve the user for an event stream request (JWT header or ticket), or None."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header:
+        raw_token = authentication.get_raw_token(header)
+        if not raw_token:
+            return None
+        try:
+            validated_token = authentication.get_validated_token(raw_token)
+            user = authentication.get_user(validated_token)
+        except (InvalidToken, AuthenticationFailed):
+            return None
+    else:
+        user_id = redeem_stream_ticket(request.GET.get("ticket", ""))
+        if user_id is None:
+            return None
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+    return user if user.is_active else None
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def event_stream_ticket(request):
+    """Issue a single-use ticket for opening the event stream with EventSource."""
+    return Response(
+        {
+            "ticket": issue_stream_ticket(request.user),
+            "expires_in": get_events_config()["TICKET_TTL"],
+        }
+    )
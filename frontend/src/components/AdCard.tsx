@@ -11,7 +11,7 @@ interface AdCardProps {
     display_price: string;
     city: { name: string };
     state: { code: string };
-    primary_image?: { image: string };
+    primary_image?: { image: string; thumbnail?: string | null };
     view_count: number;
     time_since_posted: string;
     plan?: string;
@@ -60,7 +60,7 @@ const AdCard: React.FC<AdCardProps> = ({ ad, user, onClick, showFeaturedBadge =
       <div className="relative aspect-video bg-gray-100 rounded-t-lg overflow-hidden">
         {ad.primary_image?.image ? (
           <img
-            src={ad.primary_image.image}
+            src={ad.primary_image.thumbnail || ad.primary_image.image}
             alt={ad.title}
             className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
             loading="lazy"
@@ -86,7 +86,7 @@ const FeaturedAds: React.FC = () => {
                   <div className="relative aspect-video bg-gray-100 rounded-t-lg overflow-hidden">
                     {ad.primary_image?.image ? (
                       <img
-                        src={ad.primary_image.image}
+                        src={ad.primary_image.thumbnail || ad.primary_image.image}
                         alt={ad.title}
                         className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
                       />
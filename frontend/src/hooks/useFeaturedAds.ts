@@ -29,6 +29,7 @@ interface Ad {
   primary_image?: {
     id: number;
     image: string;
+    thumbnail?: string | null;
     caption?: string;
   };
   view_count: number;
@@ -4,6 +4,8 @@
 export interface AdImage {
   id: number;
   image: string;
+  thumbnail?: string | null;
+  thumbnail_webp?: string | null;
   caption?: string;
   is_primary: boolean;
   sort_order: number;